@@ -90,9 +90,9 @@ class Actions(IntEnum):
     def create_from_paragraph(paragraph):
         actions = None
 
-        if paragraph.runs[0].bold:
+        if paragraph.bold_text is not None:
             # New action
-            text = ascii_only(' '.join(x.text for x in paragraph.runs if x.bold))
+            text = paragraph.bold_text
 
             names = text.split(',')
             actions = {Actions.keywords_to_access_set(a) for a in names}
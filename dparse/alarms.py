@@ -21,6 +21,8 @@ class Alarm(object):
     """
     Alarm Notification information.
     """
+    __slots__ = ('_table_no', '_alarms')
+
     def __init__(self, table):
         # Table number for debug purposes
         self._table_no = table.doc_table_number
@@ -30,6 +32,13 @@ class Alarm(object):
         #   value -> (Name, Description)
         self._alarms = dict()
 
+    def as_dict(self):
+        return {
+            'table_number': self._table_no,
+            'alarms': [{'number': number, 'name': name, 'description': description}
+                       for number, (name, description) in sorted(self._alarms.items())],
+        }
+
     @staticmethod
     def create_from_table(table):
         if len(table.rows) == 0:
@@ -93,5 +102,5 @@ class Alarm(object):
             return alarm
 
         except Exception as e:
-            print('Table number parsing error: {}'.format(e.message))
+            print('Table number parsing error: {}'.format(e))
             return None
@@ -0,0 +1,198 @@
+#
+# Copyright (c) 2018 - present.  Boling Consulting Solutions (bcsw.net)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+#   Library access to the managed entities of a pre-parsed G.988 document.
+#
+#   The pre-parsed file is opened once and an ME is only deep parsed the first
+#   time it is asked for, so a tool that needs two MEs pays for two MEs:
+#
+#       from api import G988Document
+#
+#       document = G988Document('G.988.PreCompiled.bin')
+#       onu_g = document.get_me(256)
+#
+#   With a binary pre-parsed file (preParse.py --binary) only the sections of
+#   the MEs asked for are read from it.  Given a cache directory, parsed MEs are
+#   also saved there, keyed by the content hash of their section and the text,
+#   style and bold runs of its paragraphs, and loaded from it by later runs
+#   until any of them change.
+#
+from __future__ import (
+    absolute_import, division, print_function, unicode_literals
+)
+import os
+import json
+import pickle
+import hashlib
+from docx import Document
+
+from section import SectionList
+from paragraphs import ParagraphList
+from styles import StyleTable
+from class_id import ClassIdList, ClassId
+
+
+class G988Document(object):
+    """ Pre-parsed G.988 document whose MEs are deep parsed on first request """
+    CACHE_VERSION = 2           # Change when the parsed ME objects or cache key change
+
+    def __init__(self, filepath, classes='11.2.4', cache_dir=None, itu=None):
+        """
+        :param filepath: (str) Pre-parsed G.988 data (JSON or binary)
+        :param classes: (str) Document section number with ME Class IDs
+        :param cache_dir: (str) Directory to save parsed MEs to and load them from
+        :param itu: (str) ITU G.988 document, only needed if the pre-parsed data
+                    does not contain paragraph information
+        """
+        self.filepath = filepath
+        self.classes = classes
+        self.cache_dir = cache_dir
+        self.itu = itu
+        self.sections = SectionList()
+        self.sections.load(filepath)
+        self._class_ids = None          # (ClassIdList) Read on first use
+        self._parsed = dict()           # Key -> (int) class ID, Value -> (ClassId) parsed ME
+        self._paragraphs = None         # Only if loaded from the ITU document
+
+        if cache_dir is not None and not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+
+    @property
+    def class_ids(self):
+        """
+        (ClassIdList) Class IDs and names from the Class ID table. Their
+        sections are only looked up when an ME is parsed
+        """
+        if self._class_ids is None:
+            self._class_ids = ClassIdList.parse_sections(self.sections, self.classes,
+                                                         find_sections=False)
+        return self._class_ids
+
+    def __contains__(self, cid):
+        return self.class_ids.has_key(cid)
+
+    def get_me(self, cid):
+        """
+        Deep parsed ME for a class ID, parsed on the first request
+
+        :param cid: (int) ME class ID
+        :return: (ClassId) Parsed ME, its section is None if the document has no
+                 section for it
+        :raises KeyError: if the class ID is not in the Class ID table
+        """
+        class_id = self._parsed.get(cid)
+        if class_id is not None:
+            return class_id
+
+        entry = self.class_ids[cid]
+        if entry.section is None:
+            entry.section = self.sections.find_section_by_name(entry.name)
+
+        # Parse a new object so that a failed parse leaves nothing half filled
+        # in for the next request
+        class_id = ClassId()
+        class_id.cid = entry.cid
+        class_id.name = entry.name
+        class_id.section = entry.section
+
+        if class_id.section is not None:
+            # Parse with just the records of its section, as the parser workers do,
+            # so that a cached ME does not carry every paragraph of the document
+            paragraphs = self.paragraphs.subset(class_id.section.paragraph_numbers)
+            cache_file = self._cache_file(class_id, paragraphs)
+            cached = self._load_cached(cache_file)
+
+            if cached is not None:
+                class_id = cached
+            else:
+                class_id.deep_parse(paragraphs)
+                self._save_cached(cache_file, class_id)
+
+        self._parsed[cid] = class_id
+        return class_id
+
+    def get_mes(self, cids):
+        """ Deep parsed MEs for several class IDs, see get_me() """
+        return [self.get_me(cid) for cid in cids]
+
+    @property
+    def paragraphs(self):
+        """ (ParagraphList) Paragraph records, from the ITU document for older files """
+        if self.sections.has_paragraphs:
+            return self.sections.paragraphs
+
+        if self._paragraphs is None:
+            if self.itu is None:
+                raise ValueError("Pre-parsed data '{}' has no paragraph information and "
+                                 "no ITU document was given".format(self.filepath))
+
+            document = Document(self.itu)
+            numbers = {p for section in self.sections for p in section.paragraph_numbers}
+            self._paragraphs = ParagraphList.create(document.paragraphs, numbers,
+                                                    styles=StyleTable.create(document.styles))
+        return self._paragraphs
+
+    def _cache_file(self, class_id, paragraphs):
+        """
+        Disk cache file of an ME, None if not caching it.
+
+        The section's content hash covers its heading, paragraph text and
+        table XML but not paragraph styles or bold runs, which the deep parse
+        also depends on, so the paragraph records are hashed as well.
+
+        :param class_id: (ClassId) ME with its section
+        :param paragraphs: (ParagraphList) Records of the section's paragraphs
+        """
+        section = class_id.section
+        if self.cache_dir is None or section.content_hash is None:
+            return None
+
+        key = hashlib.sha1('{}:{}:{}:{}'.format(G988Document.CACHE_VERSION, class_id.cid,
+                                                class_id.name,
+                                                section.content_hash).encode('utf-8'))
+        for number in section.paragraph_numbers:
+            record = paragraphs[number]
+            key.update(json.dumps([number, record.text, record.style.name,
+                                   record.style.builtin, record.bold_text]).encode('utf-8'))
+
+        key = key.hexdigest()
+        return os.path.join(self.cache_dir, 'me-{:05d}.{}.pickle'.format(class_id.cid, key))
+
+    @staticmethod
+    def _load_cached(cache_file):
+        if cache_file is None or not os.path.exists(cache_file):
+            return None
+        try:
+            with open(cache_file, 'rb') as f:
+                return pickle.load(f)
+
+        except Exception as e:
+            print("Ignoring unreadable ME cache file '{}': {}".format(cache_file, e))
+            return None
+
+    @staticmethod
+    def _save_cached(cache_file, class_id):
+        if cache_file is None:
+            return
+
+        # Remove entries for earlier versions of the section
+        directory, name = os.path.split(cache_file)
+        prefix = name.split('.')[0] + '.'
+        for old in os.listdir(directory):
+            if old.startswith(prefix) and old != name:
+                os.remove(os.path.join(directory, old))
+
+        temp_file = cache_file + '.tmp'
+        with open(temp_file, 'wb') as f:
+            pickle.dump(class_id, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, cache_file)
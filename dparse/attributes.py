@@ -73,6 +73,8 @@ class AttributeList(object):
 
 
 class Attribute(object):
+    __slots__ = ('name', 'description', 'access', 'optional', 'size', 'avc', 'tca', 'table')
+
     def __init__(self):
         self.name = None         # Attribute name (with spaces)
         self.description = []    # Description (text, paragraph numbers & Table objects)
@@ -90,6 +92,24 @@ class Attribute(object):
             format(self.name, self.access, self.optional, self.size,
                    self.avc, self.tca)
 
+    def as_dict(self, paragraphs=None):
+        """
+        :param paragraphs: (ParagraphList) If given, description paragraph numbers
+                           are replaced by their text
+        """
+        return {
+            'name': self.name,
+            'description': [paragraphs[x].text if paragraphs is not None and
+                            isinstance(x, int) and x in paragraphs else x
+                            for x in self.description],
+            'access': [a.name for a in sorted(self.access)] if self.access is not None else None,
+            'optional': self.optional,
+            'size': self.size.as_dict() if self.size is not None else None,
+            'avc': self.avc,
+            'tca': self.tca,
+            'table': [dict(row) for row in self.table] if self.table is not None else None,
+        }
+
     @staticmethod
     def create_from_paragraph(content, paragraph):
         """
@@ -97,19 +117,18 @@ class Attribute(object):
         new attribute.  If not, this paragraph is for the previously created attribute.
 
         :param content: (int) Document paragraph number
-        :param paragraph: (Paragraph) Docx Paragraph
+        :param paragraph: (ParagraphRecord) Paragraph information
 
         :return: (Attribute) new attribute or None if this is additional text
                              for a previous attribute
         """
         attribute = None
 
-        if paragraph.runs[0].bold:
+        if paragraph.bold_text is not None:
             # New attribute
             attribute = Attribute()
             # TODO: Scrub things in '()' from name of attribute
-            attribute.name = ascii_only(' '.join(x.text for x in paragraph.runs
-                                                 if x.bold)).title()
+            attribute.name = paragraph.bold_text.title()
             attribute.description.append(content)
 
         return attribute
@@ -118,7 +137,7 @@ class Attribute(object):
         # Any content?
 
         if isinstance(content, int):
-            text = ascii_only(paragraph.text).strip()
+            text = paragraph.features.stripped
             if len(text) == 0:
                 return
 
@@ -16,22 +16,26 @@ from __future__ import (
 )
 
 
+_NOT_LISTED = ('N/A', '')           # Name and description of attributes not in the table
+
+
 class AVC(object):
     """
     Attribute Value Change Notification information.
 
     Actual attribute numbers start at 1 since the 'Entity ID' is always
     the first attribute (#0) in an ME and it is never covered by an AVC.
+
+    Which attributes have an AVC is kept as a bitmask and a name and
+    description only for the attributes listed in the table.
     """
+    __slots__ = ('_table_no', '_avcs', '_names')
+
     def __init__(self, table):
         # Table number for debug purposes
         self._table_no = table.doc_table_number
-        self._attributes = {
-            attr: (False,       # If True, AVC for attribute
-                   'N/A'        # Attribute Name
-                   '')          # Description
-            for attr in range(0, 17)
-        }
+        self._avcs = 0                  # Bit n set if attribute n has an AVC
+        self._names = dict()            # Key -> attribute number, Value -> (Name, Description)
 
     def has_avc(self, attr):
         """
@@ -39,13 +43,28 @@ class AVC(object):
         :param attr: (int) attribute number
         :return: (bool)
         """
-        return self._attributes[attr][0]
+        return ((self._avcs >> attr) & 1) == 1
 
     def attribute_name(self, attr):
-        return self._attributes[attr][1]
+        return self._names.get(attr, _NOT_LISTED)[0]
 
     def attribute_description(self, attr):
-        return self._attributes[attr][2]
+        return self._names.get(attr, _NOT_LISTED)[1]
+
+    def _set(self, attr, is_avc, name, description):
+        if is_avc:
+            self._avcs |= 1 << attr
+        else:
+            self._avcs &= ~(1 << attr)
+        self._names[attr] = (name, description)
+
+    def as_dict(self):
+        return {
+            'table_number': self._table_no,
+            'attributes': [{'number': attr, 'name': name, 'description': description,
+                            'avc': self.has_avc(attr)}
+                           for attr, (name, description) in sorted(self._names.items())],
+        }
 
     @staticmethod
     def create_from_table(table):
@@ -67,9 +86,7 @@ class AVC(object):
                         assert 1 <= value <= 16, 'Invalid attribute number: {}'.format(value)
 
                         is_avc = name.strip().lower() not in ('n/a', 'Reserved')
-                        avc._attributes[value] = (is_avc,
-                                                  name.strip(),
-                                                  description.strip())
+                        avc._set(value, is_avc, name.strip(), description.strip())
 
                 except ValueError:  # Expected if of form  n..m
                     # Watch out for commentary text in AVC tables. Often a NOTE at the end
@@ -81,12 +98,10 @@ class AVC(object):
                         # NOTE: Attributes are usually 1..16 but ME 329 (vEth Interface Point)
                         #       has an n/a entry coded 0..1
                         assert 0 <= value <= 16, 'Invalid attribute number: {}'.format(value)
-                        avc._attributes[value] = (False,
-                                                  name.strip(),
-                                                  description.strip())
+                        avc._set(value, False, name.strip(), description.strip())
 
             return avc
 
         except Exception as e:
-            print('Table number parsing error: {}'.format(e.message))
+            print('Table number parsing error: {}'.format(e))
             return None
@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2018 - present.  Boling Consulting Solutions (bcsw.net)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+#   Micro-benchmark of text.ascii_only() and text.ascii_only_list() against
+#   the original per-character implementation.  The corpus is either the
+#   paragraph and table cell text of a .docx document or, if no document is
+#   given, a synthetic corpus about the size of the ITU G.988 document.
+#
+from __future__ import (
+    absolute_import, division, print_function, unicode_literals
+)
+import os
+import sys
+import random
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text import ascii_only, ascii_only_list
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='ascii_only() micro-benchmark')
+
+    parser.add_argument('--input', '-i', action='store', default=None,
+                        help='Path to a .docx document to take the text from, '
+                             'default: synthetic corpus')
+
+    parser.add_argument('--paragraphs', '-p', action='store', type=int, default=40000,
+                        help='Synthetic corpus paragraph count, default: 40000')
+
+    parser.add_argument('--cells', '-c', action='store', type=int, default=150000,
+                        help='Synthetic corpus table cell count, default: 150000')
+
+    parser.add_argument('--repeat', '-r', action='store', type=int, default=3,
+                        help='Number of timing runs, best is reported, default: 3')
+
+    return parser.parse_args()
+
+
+def legacy_ascii_only(input_text):
+    """ The original ascii_only() implementation, used as the reference """
+    replacements = {
+        160  : u'-',
+        174  : u'r',        # Registered sign
+        176  : u"degree-",  # Degree sign
+        177  : u"+/-",
+        181  : u"u",        # Micro
+        189  : u"1/2",
+        215  : u'*',
+        224  : u"`a",
+        946  : u'B',        # Beta
+        956  : u'v',
+        969  : u'w',
+        8211 : u'-',
+        8217 : u"'",
+        8220 : u"``",
+        8221 : u"''",
+        8230 : u"...",
+        8722 : u'-',
+        8804 : u'<=',
+        61664: u'->',
+        8805 : u'>=',
+        8226 : u'o',        # Bullet
+    }
+    text = input_text
+
+    return ''.join(
+            [u'' if len(i) == 0
+             else replacements[ord(i)] if ord(i) >= 128 and ord(i) in replacements
+             else i if ord(i) < 128
+             else u' ' for i in text])
+
+
+def synthetic_corpus(num_paragraphs, num_cells):
+    """
+    Text with roughly the mix found in G.988: mostly plain ASCII, with some
+    dashes, quotes, non-breaking spaces, symbols and the odd unmapped character
+    """
+    rnd = random.Random(988)
+    words = ('managed', 'entity', 'attribute', 'this', 'the', 'of', 'ONU', 'ANI-G',
+             'GEM', 'port', 'network', 'CTP', 'T-CONT', 'bytes', '(R,', 'W)', '(mandatory)',
+             'value', 'indicates', 'that', 'a', 'is', 'to', '0x0000', 'Ethernet', 'UNI')
+    specials = ('–', '’', '“', '”', ' ', '≤', '≥',
+                '•', '°', '±', '−', '…', 'μ', '→')
+
+    def sentence(num_words, special_rate):
+        text = list()
+        for _ in range(num_words):
+            text.append(rnd.choice(words))
+            if rnd.random() < special_rate:
+                text.append(rnd.choice(specials))
+        return ' '.join(text)
+
+    paragraphs = [sentence(rnd.randint(3, 60), 0.02) for _ in range(num_paragraphs)]
+    cells = [sentence(rnd.randint(1, 6), 0.01) for _ in range(num_cells)]
+    return paragraphs, cells
+
+
+def document_corpus(source_file):
+    from docxstream import StreamDocument, StreamParagraph
+
+    paragraphs = list()
+    cells = list()
+    for block in StreamDocument(source_file).iter_block_items():
+        if isinstance(block, StreamParagraph):
+            paragraphs.append(block.text)
+        else:
+            for row in block.rows:
+                cells.extend(c.text for c in row.cells)
+    return paragraphs, cells
+
+
+def best_of(repeat, func):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    args = parse_args()
+
+    if args.input is not None:
+        paragraphs, cells = document_corpus(args.input)
+        source = args.input
+    else:
+        paragraphs, cells = synthetic_corpus(args.paragraphs, args.cells)
+        source = 'synthetic'
+
+    rows = [cells[n:n + 4] for n in range(0, len(cells), 4)]
+    corpus = paragraphs + cells
+    num_chars = sum(len(t) for t in corpus)
+
+    print('Corpus: {}, {} paragraphs, {} cells, {} characters, {} non-ASCII'.
+          format(source, len(paragraphs), len(cells), num_chars,
+                 sum(1 for t in corpus for c in t if ord(c) >= 128)))
+
+    # Verify before timing
+    mismatches = [t for t in corpus if ascii_only(t) != legacy_ascii_only(t)]
+    mismatches.extend(c for r in rows
+                      for c, b in zip(r, ascii_only_list(r)) if b != legacy_ascii_only(c))
+    print('Output identical to original: {}'.format('yes' if not mismatches else
+                                                     'NO, {} differ'.format(len(mismatches))))
+
+    legacy = best_of(args.repeat, lambda: [legacy_ascii_only(t) for t in corpus])
+    single = best_of(args.repeat, lambda: [ascii_only(t) for t in corpus])
+    legacy_rows = best_of(args.repeat, lambda: [[legacy_ascii_only(c) for c in r] for r in rows])
+    batch = best_of(args.repeat, lambda: [ascii_only_list(r) for r in rows])
+
+    print('')
+    print('{:<32} {:>10} {:>14} {:>8}'.format('', 'seconds', 'chars/s', 'speedup'))
+    for name, elapsed, base, chars in (
+            ('original, all text', legacy, legacy, num_chars),
+            ('ascii_only, all text', single, legacy, num_chars),
+            ('original, table rows', legacy_rows, legacy_rows, num_chars - sum(map(len, paragraphs))),
+            ('ascii_only_list, table rows', batch, legacy_rows, num_chars - sum(map(len, paragraphs)))):
+        print('{:<32} {:>10.4f} {:>14,.0f} {:>7.1f}x'.format(name, elapsed, chars / elapsed,
+                                                               base / elapsed))
+
+    return 0 if not mismatches else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2018 - present.  Boling Consulting Solutions (bcsw.net)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+#   Verifies the ClassId content dispatch table (classify.py) against the
+#   per-state parsers in contents.py and times the two.
+#
+#   Every parser is run against every paragraph and table of every ME section
+#   (not just the ones it would see during a deep parse) and the dispatch
+#   result compared with it.  The per-item cost is then timed over the parser
+#   calls an actual deep parse of all MEs makes.
+#
+from __future__ import (
+    absolute_import, division, print_function, unicode_literals
+)
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import contents
+from classify import ContentDispatch
+from class_id import ClassIdList, ClassId
+from bench_stages import load, pre_parse, quiet
+import generate
+
+PARSERS = (contents.initial_parser, contents.description_parser,
+           contents.relationships_parser, contents.attributes_parser,
+           contents.actions_parser, contents.notifications_parser,
+           contents.alarms_parser, contents.avcs_parser, contents.tests_parser,
+           contents.eos_parser)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Content dispatch verification and benchmark')
+
+    parser.add_argument('--input', '-i', action='store', default=None,
+                        help='Pre-parsed G.988 data (JSON or binary), default: a generated '
+                             'synthetic document')
+
+    parser.add_argument('--scale', '-s', action='store', type=int, default=20,
+                        help='Synthetic document ME section groups, default: 20')
+
+    parser.add_argument('--repeat', '-r', action='store', type=int, default=5,
+                        help='Number of timing runs, best is reported, default: 5')
+
+    return parser.parse_args()
+
+
+class RecordingDispatch(ContentDispatch):
+    """ Records the parser calls of a deep parse """
+    def __init__(self):
+        super(RecordingDispatch, self).__init__()
+        self.enabled = False
+        self.calls = list()
+
+    def parse(self, parser, content, paragraphs):
+        self.calls.append((parser, content, paragraphs))
+        return super(RecordingDispatch, self).parse(parser, content, paragraphs)
+
+
+def outcome(parser, content, paragraphs):
+    """ Parser result, or the type of exception raised """
+    try:
+        return parser(content, paragraphs)
+    except Exception as e:
+        return type(e)
+
+
+def reset_categories(paragraphs):
+    for number in paragraphs:
+        paragraphs[number].category = None
+
+
+def verify(sections, class_ids):
+    """ Every parser against every ME content item. Returns the number of mismatches """
+    dispatch = ContentDispatch()
+    checked, mismatches = 0, 0
+
+    for _pass in range(2):      # First pass learns entries, second checks all of them
+        for class_id in class_ids:
+            for content in class_id.section.contents:
+                paragraphs = sections.paragraphs if isinstance(content, int) else None
+
+                for parser in PARSERS:
+                    expected = outcome(parser, content, paragraphs)
+                    result = outcome(lambda c, p: dispatch.parse(parser, c, p),
+                                     content, paragraphs)
+                    checked += 1
+                    if result != expected:
+                        mismatches += 1
+                        if mismatches <= 10:
+                            print('  MISMATCH: {} {}: {} != {}'.format(parser.__name__, content,
+                                                                      result, expected))
+    return checked, mismatches, len(dispatch)
+
+
+def main():
+    args = parse_args()
+    workdir = None
+
+    try:
+        if args.input is None:
+            workdir = tempfile.mkdtemp(prefix='g988-dispatch-')
+            source_file = os.path.join(workdir, 'G.988.Synthetic.docx')
+            input_file = os.path.join(workdir, 'G.988.PreCompiled.json')
+            generate.generate(source_file, args.scale)
+            pre_parse(source_file, input_file, stream=True)
+        else:
+            input_file = args.input
+
+        sections = load(input_file)
+        with quiet():
+            class_ids = [c for c in ClassIdList.parse_sections(sections, '11.2.4').values()
+                         if c.section is not None]
+
+        num_items = sum(len(c.section.contents) for c in class_ids)
+        print('{}: {} MEs with {} content items'.format(input_file, len(class_ids), num_items))
+
+        checked, mismatches, entries = verify(sections, class_ids)
+        print('Verified {} parser/item pairs against {} dispatch entries: {}'.
+              format(checked, entries, 'all identical' if not mismatches else
+                     '{} MISMATCHES'.format(mismatches)))
+
+        # Parser calls made by an actual deep parse
+        recorder = RecordingDispatch()
+        original_dispatch, ClassId.DISPATCH = ClassId.DISPATCH, recorder
+        try:
+            with quiet():
+                for class_id in class_ids:
+                    class_id.deep_parse(sections.paragraphs)
+        finally:
+            ClassId.DISPATCH = original_dispatch
+        calls = recorder.calls
+
+        def run_parsers():
+            for parser, content, paragraphs in calls:
+                parser(content, paragraphs)
+
+        def run_dispatch(dispatch):
+            parse = dispatch.parse
+            for parser, content, paragraphs in calls:
+                parse(parser, content, paragraphs)
+
+        def run_cold():
+            reset_categories(sections.paragraphs)
+            run_dispatch(ContentDispatch())
+
+        warm = ContentDispatch()
+        run_dispatch(warm)
+
+        results = (
+            ('per-state parsers', min(timeit.repeat(run_parsers, number=1, repeat=args.repeat))),
+            ('dispatch, cold', min(timeit.repeat(run_cold, number=1, repeat=args.repeat))),
+            ('dispatch, warm', min(timeit.repeat(lambda: run_dispatch(warm), number=1,
+                                                 repeat=args.repeat))),
+        )
+        print('')
+        print('{:<24} {:>10} {:>12} {:>8}'.format('', 'seconds', 'us/item', 'speedup'))
+        for name, elapsed in results:
+            print('{:<24} {:>10.4f} {:>12.3f} {:>7.1f}x'.format(name, elapsed,
+                                                               elapsed * 1e6 / len(calls),
+                                                               results[0][1] / elapsed))
+        return 0 if not mismatches else 1
+
+    finally:
+        if workdir is not None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
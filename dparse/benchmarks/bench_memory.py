@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2018 - present.  Boling Consulting Solutions (bcsw.net)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+#   Memory used by the model objects, measured with tracemalloc:
+#
+#     - bytes per section (SectionHeading, not counting its tables)
+#     - bytes per table
+#     - bytes per ME (ClassId, its attributes, alarms, AVCs, ...) after a
+#       deep parse, not counting the sections and paragraphs it refers to
+#
+#   The text itself is loaded before measuring, so only the objects built from
+#   it are counted.  Save a report with --output before a change and pass it
+#   to --compare afterwards to see the difference.
+#
+from __future__ import (
+    absolute_import, division, print_function, unicode_literals
+)
+import os
+import gc
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from section import SectionHeading
+from tables import Table
+from class_id import ClassIdList
+from bench_stages import load, pre_parse, quiet
+import generate
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Model object memory benchmark')
+
+    parser.add_argument('--input', '-i', action='store', default=None,
+                        help='Pre-parsed G.988 data (JSON or binary), default: a generated '
+                             'synthetic document')
+
+    parser.add_argument('--scale', '-s', action='store', type=int, default=20,
+                        help='Synthetic document ME section groups, default: 20')
+
+    parser.add_argument('--output', '-o', action='store', default=None,
+                        help='Save the results to this JSON report')
+
+    parser.add_argument('--compare', '-c', action='store', default=None,
+                        help='JSON report of an earlier run to compare against')
+
+    return parser.parse_args()
+
+
+def retained(build):
+    """ Bytes still allocated once build() returns, and its result """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return size, result
+
+
+def deep_parse(sections):
+    with quiet():
+        class_ids = ClassIdList.parse_sections(sections, '11.2.4')
+        for class_id in class_ids.values():
+            if class_id.section is not None:
+                class_id.deep_parse(sections.paragraphs)
+    return list(class_ids.values())
+
+
+def measure(sections):
+    section_dicts = sections.as_dict_list()
+    table_dicts = [content for section in section_dicts for content in section['contents']
+                   if isinstance(content, dict)]
+
+    section_bytes, headings = retained(lambda: [SectionHeading.load_dict(d)
+                                                for d in section_dicts])
+    table_bytes, tables = retained(lambda: [Table.load_dict(d) for d in table_dicts])
+
+    deep_parse(sections)        # Paragraph features and dispatch entries are cached
+    me_bytes, class_ids = retained(lambda: deep_parse(sections))
+
+    return OrderedDict([
+        ('sections', len(headings)),
+        ('tables', len(tables)),
+        ('managed_entities', len(class_ids)),
+        ('attributes', sum(len(c.attributes) for c in class_ids)),
+        ('bytes_per_section', (section_bytes - table_bytes) / max(len(headings), 1)),
+        ('bytes_per_table', table_bytes / max(len(tables), 1)),
+        ('bytes_per_me', me_bytes / max(len(class_ids), 1)),
+    ])
+
+
+def main():
+    args = parse_args()
+    workdir = None
+
+    try:
+        if args.input is None:
+            workdir = tempfile.mkdtemp(prefix='g988-memory-')
+            source_file = os.path.join(workdir, 'G.988.Synthetic.docx')
+            input_file = os.path.join(workdir, 'G.988.PreCompiled.json')
+            generate.generate(source_file, args.scale)
+            pre_parse(source_file, input_file, stream=True)
+        else:
+            input_file = args.input
+
+        results = measure(load(input_file))
+        baseline = None
+        if args.compare is not None:
+            with open(args.compare, 'r') as f:
+                baseline = json.load(f)
+
+        print('{}: {} sections, {} tables, {} MEs, {} attributes'.
+              format(input_file, results['sections'], results['tables'],
+                     results['managed_entities'], results['attributes']))
+        print('')
+        if baseline is None:
+            print('{:<20} {:>10}'.format('', 'bytes'))
+        else:
+            print('{:<20} {:>10} {:>10} {:>8}'.format('', 'before', 'after', 'change'))
+
+        for name in ('bytes_per_section', 'bytes_per_table', 'bytes_per_me'):
+            label = name.replace('bytes_per_', 'per ').replace('_', ' ')
+            if baseline is None:
+                print('{:<20} {:>10.0f}'.format(label, results[name]))
+            else:
+                before = baseline[name]
+                print('{:<20} {:>10.0f} {:>10.0f} {:>7.0f}%'.format(
+                    label, before, results[name],
+                    (results[name] - before) * 100.0 / before if before else 0.0))
+
+        if args.output is not None:
+            with open(args.output, 'w') as f:
+                f.write(json.dumps(results, indent=2, separators=(',', ': ')))
+        return 0
+
+    finally:
+        if workdir is not None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
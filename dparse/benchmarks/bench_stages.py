@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2018 - present.  Boling Consulting Solutions (bcsw.net)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+#   End-to-end timing of the parsing stages on synthetic G.988 documents
+#   (see generate.py) of increasing size:
+#
+#     - preParse.Main.start() with python-docx and with the streaming reader
+#     - SectionList.load() of the JSON and binary pre-compiled files
+#     - ClassId.deep_parse() of every ME with a section
+#
+#   Throughput is reported in paragraphs/s and tables/s.  For the pre-parse
+#   these are the body paragraphs and tables of the document, for loading
+#   and deep parsing they are the paragraphs and tables within the sections.
+#
+from __future__ import (
+    absolute_import, division, print_function, unicode_literals
+)
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docxstream import StreamDocument, StreamParagraph
+from section import SectionList
+from class_id import ClassIdList
+import preParse
+import generate
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Parsing stage benchmarks')
+
+    parser.add_argument('--scales', '-s', action='store', default='1,5,20',
+                        help='Comma separated document sizes, in multiples of the base '
+                             'size, default: 1,5,20')
+
+    parser.add_argument('--base', '-b', action='store', type=int, default=1,
+                        help='ME section groups ({} MEs each) in a 1x document, default: 1'.
+                        format(len(generate.MANAGED_ENTITIES)))
+
+    parser.add_argument('--repeat', '-r', action='store', type=int, default=3,
+                        help='Number of timing runs, best is reported, default: 3')
+
+    parser.add_argument('--workdir', '-w', action='store', default=None,
+                        help='Directory for the generated documents and pre-compiled files. '
+                             'Documents already there are reused, default: a temporary '
+                             'directory that is removed afterwards')
+
+    parser.add_argument('--no-docx', action='store_true',
+                        help='Skip the python-docx pre-parse (the slowest stage)')
+
+    return parser.parse_args()
+
+
+@contextlib.contextmanager
+def quiet():
+    """ Discard the progress output of the stages """
+    with open(os.devnull, 'w') as devnull:
+        with contextlib.redirect_stdout(devnull):
+            yield
+
+
+def best_of(repeat, func):
+    """ Lowest wall time of 'repeat' calls and the result of the last call """
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def document_counts(source_file):
+    """ (paragraphs, tables) of the document body """
+    paragraphs, tables = 0, 0
+    for block in StreamDocument(source_file).iter_block_items():
+        if isinstance(block, StreamParagraph):
+            paragraphs += 1
+        else:
+            tables += 1
+    return paragraphs, tables
+
+
+def section_counts(sections):
+    """ (paragraphs, tables) within the sections """
+    return (sum(len(s.paragraph_numbers) for s in sections),
+            sum(len(s.tables) for s in sections))
+
+
+def pre_parse(source_file, output, stream=False, binary=False):
+    argv = ['--input', source_file, '--output', output]
+    if stream:
+        argv.append('--stream')
+    if binary:
+        argv.append('--binary')
+
+    args = preParse.parse_args(argv)
+    with quiet():
+        preParse.Main(args).start(source_file, output)
+
+
+def load(filepath):
+    sections = SectionList()
+    sections.load(filepath)
+    return sections
+
+
+def deep_parse(filepath, repeat):
+    """
+    Deep parse every ME with a section. Only the deep parse is timed
+
+    :return: (float, list) Best time, sections of the MEs parsed
+    """
+    best, parsed = None, None
+    for _ in range(repeat):
+        sections = load(filepath)
+        with quiet():
+            class_ids = ClassIdList.parse_sections(sections, '11.2.4')
+            parsed = [c for c in class_ids.values() if c.section is not None]
+
+            start = time.perf_counter()
+            for class_id in parsed:
+                class_id.deep_parse(sections.paragraphs)
+            elapsed = time.perf_counter() - start
+
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, [c.section for c in parsed]
+
+
+def report(stage, scale, elapsed, paragraphs, tables):
+    print('{:<28} {:>5}x {:>9.3f} {:>9} {:>14,.0f} {:>7} {:>12,.0f}'.
+          format(stage, scale, elapsed, paragraphs, paragraphs / elapsed,
+                 tables, tables / elapsed))
+
+
+def main():
+    args = parse_args()
+    scales = [int(s) for s in args.scales.split(',')]
+    workdir = args.workdir or tempfile.mkdtemp(prefix='g988-bench-')
+    if not os.path.isdir(workdir):
+        os.makedirs(workdir)
+
+    try:
+        print('{:<28} {:>6} {:>9} {:>9} {:>14} {:>7} {:>12}'.
+              format('Stage', 'Size', 'seconds', 'paras', 'paras/s', 'tables', 'tables/s'))
+
+        for scale in scales:
+            groups = scale * args.base
+            source_file = os.path.join(workdir, 'G.988.Synthetic.{}.docx'.format(groups))
+            json_file = os.path.join(workdir, 'G.988.PreCompiled.{}.json'.format(groups))
+            binary_file = os.path.join(workdir, 'G.988.PreCompiled.{}.bin'.format(groups))
+
+            if not os.path.exists(source_file):
+                generate.generate(source_file, groups)
+
+            doc_paragraphs, doc_tables = document_counts(source_file)
+
+            if not args.no_docx:
+                elapsed, _ = best_of(args.repeat, lambda: pre_parse(source_file, json_file))
+                report('preParse (python-docx)', scale, elapsed, doc_paragraphs, doc_tables)
+
+            elapsed, _ = best_of(args.repeat,
+                                 lambda: pre_parse(source_file, json_file, stream=True))
+            report('preParse (stream)', scale, elapsed, doc_paragraphs, doc_tables)
+
+            pre_parse(source_file, binary_file, stream=True, binary=True)
+
+            elapsed, sections = best_of(args.repeat, lambda: load(json_file))
+            paragraphs, tables = section_counts(sections)
+            report('SectionList.load (JSON)', scale, elapsed, paragraphs, tables)
+
+            elapsed, sections = best_of(args.repeat, lambda: list(load(binary_file)))
+            report('SectionList.load (binary)', scale, elapsed, paragraphs, tables)
+
+            elapsed, me_sections = deep_parse(json_file, args.repeat)
+            paragraphs, tables = section_counts(me_sections)
+            report('ClassId.deep_parse', scale, elapsed, paragraphs, tables)
+
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
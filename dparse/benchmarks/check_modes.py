@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2018 - present.  Boling Consulting Solutions (bcsw.net)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+#   Regression check that the pre-parse modes all give the same result on a
+#   generated document (see generate.py), including its merged cell tables:
+#
+#     - Every table built by Table.create() from the python-docx object model
+#       cells (as before the cell grid extractor), from the cell grid of the
+#       python-docx table, from the stream reader and from the records the
+#       pipeline hands to its workers has the same title, headings and rows
+#
+#     - preParse writes the same file with python-docx, --stream, --jobs 2 and
+#       --pipeline 2, alone and with --stream
+#
+#   Exits with a non-zero status if anything differs.
+#
+from __future__ import (
+    absolute_import, division, print_function, unicode_literals
+)
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+import contextlib
+from unittest import mock
+from docx import Document
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docxstream import StreamDocument, StreamTable, StreamRow
+from styles import StyleTable
+from tables import Table
+import preParse
+import generate
+
+MODES = (
+    ('python-docx', []),
+    ('--stream', ['--stream']),
+    ('--jobs 2', ['--jobs', '2']),
+    ('--pipeline 2', ['--pipeline', '2']),
+    ('--stream --jobs 2', ['--stream', '--jobs', '2']),
+    ('--stream --pipeline 2', ['--stream', '--pipeline', '2']),
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Pre-parse mode regression check')
+
+    parser.add_argument('--scale', '-s', action='store', type=int, default=2,
+                        help='ME section groups of the generated document, default: 2')
+
+    parser.add_argument('--input', '-i', action='store', default=None,
+                        help='Check this .docx document instead of a generated one')
+
+    parser.add_argument('--workdir', '-w', action='store', default=None,
+                        help='Directory for the generated document and pre-compiled files, '
+                             'default: a temporary directory that is removed afterwards')
+
+    return parser.parse_args()
+
+
+@contextlib.contextmanager
+def quiet():
+    """ Discard the progress output of the stages """
+    with open(os.devnull, 'w') as devnull:
+        with contextlib.redirect_stdout(devnull):
+            yield
+
+
+class DocxCell(object):
+    """ A python-docx cell with the text and style a StreamCell has """
+    def __init__(self, cell, styles):
+        self.text = cell.text
+        self.style = styles.style_of(cell.paragraphs[0]) if len(cell.paragraphs) else None
+
+
+class DocxGrid(object):
+    """
+    Cells of a python-docx table as laid out by its object model, in the
+    shape of a StreamTable so that Table.create() can build from it
+    """
+    def __init__(self, doc_table, styles):
+        self.columns = doc_table.columns
+        width = len(self.columns)
+        cells = [DocxCell(cell, styles) for cell in doc_table._cells]
+        self.rows = [StreamRow(cells[n:n + width]) for n in range(0, len(cells), width)]
+
+
+def table_summary(table):
+    """ What is compared of a Table """
+    return (table.full_title, table.short_title, table.table_number, table.num_columns,
+            table.heading, [dict(row) for row in table.rows])
+
+
+def check_tables(source_file):
+    """
+    :return: (tuple) Descriptions of the differences found, number of tables
+    """
+    document = Document(source_file)
+    styles = StyleTable.create(document.styles)
+    stream = StreamDocument(source_file)
+    stream_tables = [b for b in stream.iter_block_items() if isinstance(b, StreamTable)]
+
+    docx_tables = [b for b in preParse.Main.iter_block_items(document)
+                   if isinstance(b, preParse.DocxTable)]
+
+    if len(docx_tables) != len(stream_tables):
+        return ['python-docx has {} tables, the stream reader {}'.
+                format(len(docx_tables), len(stream_tables))], 0
+
+    errors = list()
+    for number, (doc_table, stream_table) in enumerate(zip(docx_tables, stream_tables)):
+        with mock.patch.object(Table, 'grid', staticmethod(DocxGrid)):
+            expected = table_summary(Table.create(number, doc_table, styles))
+
+        built = (
+            ('cell grid', Table.create(number, doc_table, styles)),
+            ('stream', Table.create(number, stream_table, stream.styles)),
+            ('pipeline', Table.create(number, preParse.plain_block(doc_table, styles), styles)),
+        )
+        for name, table in built:
+            if table_summary(table) != expected:
+                errors.append('Table {} ({}) differs from the object model cells with the {} '
+                              'reader'.format(number, expected[0], name))
+    return errors, len(docx_tables)
+
+
+def check_modes(source_file, workdir):
+    """
+    :return: (list) Descriptions of the differences found
+    """
+    outputs = list()
+    for name, argv in MODES:
+        output = os.path.join(workdir, 'G.988.PreCompiled.{}.json'.format(len(outputs)))
+        args = preParse.parse_args(['--input', source_file, '--output', output] + argv)
+        with quiet():
+            preParse.Main(args).start(source_file, output)
+
+        with open(output, 'rb') as f:
+            outputs.append((name, f.read()))
+
+    reference_name, reference = outputs[0]
+    return ['preParse {} output differs from {}'.format(name, reference_name)
+            for name, data in outputs[1:] if data != reference]
+
+
+def main():
+    args = parse_args()
+    workdir = args.workdir or tempfile.mkdtemp(prefix='g988-check-')
+    if not os.path.isdir(workdir):
+        os.makedirs(workdir)
+
+    try:
+        source_file = args.input
+        if source_file is None:
+            source_file = os.path.join(workdir, 'G.988.Synthetic.{}.docx'.format(args.scale))
+            generate.generate(source_file, args.scale)
+
+        errors, tables = check_tables(source_file)
+        print('Checked {} tables with 4 readers'.format(tables))
+
+        errors.extend(check_modes(source_file, workdir))
+        print('Checked preParse output of {} modes'.format(len(MODES)))
+
+        for error in errors:
+            print('  {}'.format(error))
+        print('All identical' if not errors else '{} differences'.format(len(errors)))
+        return 1 if errors else 0
+
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,263 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2018 - present.  Boling Consulting Solutions (bcsw.net)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+#   Writes a synthetic .docx document laid out like ITU G.988 so that the
+#   parsing stages can be run and timed without the ITU document.
+#
+#   The document uses the G.988 style names (Heading n, Headingb, Attribute,
+#   Attribute follower, enumlev1, Table_head, Table_text, ...) and has a
+#   chapter 9 of ME sections with description, relationships, attributes,
+#   actions and notifications (alarm, threshold crossing alert and attribute
+#   value change tables with merged title rows), the 11.2.4 Class ID table
+#   and an annex of tables with horizontally and vertically merged cells.
+#   Each unit of scale adds another group of ME sections.
+#
+from __future__ import (
+    absolute_import, division, print_function, unicode_literals
+)
+import sys
+import argparse
+from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+
+# (Class ID, name, has threshold crossing alerts) for the MEs of each group
+MANAGED_ENTITIES = (
+    (2, 'ONU-G', False),
+    (5, 'Cardholder', False),
+    (6, 'Circuit pack', False),
+    (11, 'Physical path termination point Ethernet UNI', False),
+    (45, 'MAC bridge service profile', False),
+    (47, 'MAC bridge port configuration data', False),
+    (84, 'VLAN tagging filter data', False),
+    (89, 'Ethernet performance monitoring history data', True),
+    (130, 'IEEE 802.1p mapper service profile', False),
+    (171, 'Extended VLAN tagging operation configuration data', False),
+    (268, 'GEM port network CTP', False),
+    (312, 'FEC performance monitoring history data', True),
+)
+
+STYLES = ('Headingb', 'Attribute', 'Attribute follower', 'enumlev1', 'Note',
+          'Figure', 'Figure_Legend', 'Table_head', 'Table_text')
+
+ATTRIBUTES_PER_ME = 6
+ANNEX_TABLES_PER_GROUP = 2
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Synthetic G.988 document generator')
+
+    parser.add_argument('--output', '-o', action='store',
+                        default='G.988.Synthetic.docx',
+                        help='Output filename, default: G.988.Synthetic.docx')
+
+    parser.add_argument('--scale', '-s', action='store', type=int, default=1,
+                        help='Number of ME section groups ({} MEs each), default: 1'.
+                        format(len(MANAGED_ENTITIES)))
+
+    return parser.parse_args()
+
+
+def me_name(name, group):
+    return name if group == 0 else '{} {}'.format(name, group)
+
+
+def me_class_id(cid, group):
+    return cid + 1000 * group
+
+
+def add_styles(document):
+    for name in STYLES:
+        try:
+            document.styles[name]
+        except KeyError:
+            document.styles.add_style(name, WD_STYLE_TYPE.PARAGRAPH)
+
+
+def add_table(document, rows, head_rows=1, title=None):
+    """
+    Add a table of text rows. If a title is given it is placed in a first
+    row with all cells merged.  The first 'head_rows' rows after the title
+    are given the Table_head style and the rest Table_text.
+    """
+    num_columns = len(rows[0])
+    table = document.add_table(rows=0, cols=num_columns)
+
+    if title is not None:
+        cells = table.add_row().cells
+        merged = cells[0].merge(cells[-1])
+        merged.text = title
+
+    for row_num, values in enumerate(rows):
+        cells = table.add_row().cells
+        style = document.styles['Table_head' if row_num < head_rows else 'Table_text']
+        for cell, value in zip(cells, values):
+            cell.text = value
+            cell.paragraphs[0].style = style
+
+    return table
+
+
+def add_attribute(document, number, name, group):
+    paragraph = document.add_paragraph(style='Attribute')
+    paragraph.add_run('{}:'.format(name)).bold = True
+
+    if number == 0:
+        paragraph.add_run(' This attribute uniquely identifies each instance of this '
+                          'managed entity. There is only one instance, number 0x0000. '
+                          '(R) (mandatory) (2 bytes)')
+        return
+
+    access = ('R', 'R,W', 'R,W,Set-by-create')[number % 3]
+    optional = 'optional' if number % 4 == 3 else 'mandatory'
+
+    paragraph.add_run(' This attribute’s value ranges from 0..{} and is used by '
+                      'group {} – “as described”. ({}) ({}) ({} bytes)'.
+                      format(1 << (8 * (number % 4 + 1)), group, access, optional,
+                             number % 4 + 1))
+
+    if number % 2:
+        document.add_paragraph('0\tDisabled', style='enumlev1')
+        document.add_paragraph('1\tEnabled', style='enumlev1')
+
+    if number % 3 == 2:
+        document.add_paragraph('Attribute detail, values ≤ 255 are valid.',
+                               style='Attribute follower')
+
+
+def add_managed_entity(document, group, index, name, tca):
+    """ One ME section, in the layout of G.988 clause 9 """
+    document.add_paragraph('9.{}.{} {}'.format(group + 1, index + 1, name), style='Heading 3')
+    document.add_paragraph('This managed entity represents the {} of the ONU. An '
+                           'instance is created by the ONU – or by the OLT – '
+                           'as described below.'.format(name), style='Normal')
+    document.add_paragraph('')
+
+    document.add_paragraph('Relationships', style='Headingb')
+    document.add_paragraph('One or more instances of this managed entity are associated '
+                           'with the ONU-G managed entity.', style='Normal')
+
+    document.add_paragraph('Attributes', style='Headingb')
+    add_attribute(document, 0, 'Managed entity id', group)
+    for number in range(1, ATTRIBUTES_PER_ME):
+        add_attribute(document, number, 'Attribute {} setting'.format(number), group)
+        if number == 3:
+            add_table(document, [('Value', 'Meaning'),
+                                 ('0', 'Off'), ('1', 'On'), ('2..255', 'Reserved')])
+
+    document.add_paragraph('Actions', style='Headingb')
+    paragraph = document.add_paragraph(style='Attribute')
+    paragraph.add_run('Create, delete, get, set').bold = True
+    paragraph.add_run(' (see clause A.1.1)')
+
+    document.add_paragraph('Notifications', style='Headingb')
+    if tca:
+        add_table(document,
+                  [('Alarm number', 'Threshold crossing alert',
+                    'Threshold value attribute #'),
+                   ('0', 'Errored seconds', '1'),
+                   ('1', 'Severely errored seconds', '2'),
+                   ('2..223', 'Reserved', '')],
+                  title='Threshold crossing alert')
+    else:
+        add_table(document,
+                  [('Alarm number', 'Alarm', 'Description'),
+                   ('0', 'Equipment alarm', 'Functional failure on an internal interface'),
+                   ('1', 'Powering alarm', 'Loss of external power to battery'),
+                   ('2..207', 'Reserved', ''),
+                   ('208..223', 'Vendor-specific', 'Reserved for vendor-specific alarms')],
+                  title='Alarm')
+
+    add_table(document,
+              [('Number', 'Attribute value change', 'Description'),
+               ('1..2', 'N/A', ''),
+               ('3', 'Attribute 3 setting', 'Attribute 3 setting change'),
+               ('4..16', 'Reserved', '')],
+              title='Attribute value change')
+
+    document.add_paragraph('Vendor-specific usage', style='Headingb')
+    document.add_paragraph('Vendors may make use of this managed entity as needed.',
+                           style='Normal')
+
+
+def add_annex_table(document, group, number):
+    """ Table with a numbered title and cells merged both ways """
+    table = document.add_table(rows=4, cols=4)
+    title = table.cell(0, 0).merge(table.cell(0, 3))
+    title.text = 'Table A.{}-{} – Merged cell example'.format(group + 1, number + 1)
+
+    head = table.cell(1, 0).merge(table.cell(2, 0))     # Vertical merge
+    head.text = 'Parameter'
+    span = table.cell(1, 1).merge(table.cell(1, 3))     # Horizontal merge
+    span.text = 'Values'
+
+    for column in range(1, 4):
+        table.cell(2, column).text = 'Value {}'.format(column)
+        table.cell(3, column).text = '{}'.format(column * (number + 1))
+    table.cell(3, 0).text = 'Setting'
+
+    for row in table.rows:
+        for cell in row.cells:
+            cell.paragraphs[0].style = document.styles['Table_text']
+
+
+def generate(filepath, scale=1):
+    """
+    Write a synthetic G.988 document
+
+    :param filepath: (str) Output .docx file
+    :param scale: (int) Number of ME section groups
+    """
+    document = Document()
+    add_styles(document)
+
+    document.add_paragraph('1 Scope', style='Heading 1')
+    document.add_paragraph('This Recommendation specifies the optical network unit (ONU) '
+                           'management and control interface (OMCI) – synthetic.',
+                           style='Normal')
+
+    document.add_paragraph('9 Managed entity definitions', style='Heading 1')
+    for group in range(scale):
+        document.add_paragraph('9.{} Managed entity group {}'.format(group + 1, group + 1),
+                               style='Heading 2')
+        for index, (_cid, name, tca) in enumerate(MANAGED_ENTITIES):
+            add_managed_entity(document, group, index, me_name(name, group), tca)
+
+    document.add_paragraph('11 Managed entity identifiers', style='Heading 1')
+    document.add_paragraph('11.2.4 Managed entity identifiers', style='Heading 3')
+
+    rows = [('Managed entity class value', 'Managed entity'), ('0..1', 'Reserved')]
+    for group in range(scale):
+        rows.extend((str(me_class_id(cid, group)), me_name(name, group))
+                    for cid, name, _tca in MANAGED_ENTITIES)
+    add_table(document, rows, title='Table 11.2.4-1 – Managed entity identifiers')
+
+    document.add_paragraph('Annex A Merged cell tables', style='Heading 1')
+    for group in range(scale):
+        document.add_paragraph('A.{} Table group {}'.format(group + 1, group + 1),
+                               style='Heading 2')
+        for number in range(ANNEX_TABLES_PER_GROUP):
+            add_annex_table(document, group, number)
+
+    document.save(filepath)
+
+
+def main():
+    args = parse_args()
+    generate(args.output, args.scale)
+    print('Wrote {} (scale {})'.format(args.output, args.scale))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
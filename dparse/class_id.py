@@ -15,18 +15,17 @@
 from __future__ import (
     absolute_import, division, print_function, unicode_literals
 )
-try:
-    # Python 3
-    from itertools import zip_longest
-except ImportError:
-    # Python 2
-    from itertools import izip_longest as zip_longest
-from transitions import Machine
+from itertools import zip_longest
+from concurrent.futures import ProcessPoolExecutor
+from state_table import StateTable
+from classify import ContentDispatch
+from timing import Timing
 from contents import *
 from attributes import AttributeList, Attribute
 from actions import Actions
 from avc import AVC
 from alarms import Alarm
+from tca import ThresholdCrossingAlert
 
 
 class ClassIdList(object):
@@ -63,12 +62,15 @@ class ClassIdList(object):
         return self
 
     @staticmethod
-    def parse_sections(sections, cid_section):
+    def parse_sections(sections, cid_section, find_sections=True):
         """
         Look for a specific section and determine the table it is in.
 
         After finding the section, this is more focused on the latest
         G.988 document where the list is in the one and only table
+
+        :param find_sections: (bool) Also look up the section of each ME by its
+                              name. If False, the caller does this, see api.py
         """
         cid_list = ClassIdList()
         cid_heading_section = sections.find_section(cid_section)
@@ -89,7 +91,8 @@ class ClassIdList(object):
                         cid.name = row.get(headings[1])
                         cid_list.add(cid)
 
-                        cid.section = sections.find_section_by_name(cid.name)
+                        if find_sections:
+                            cid.section = sections.find_section_by_name(cid.name)
 
                     except ValueError as _e:
                         pass        # Expected for reserved range statements
@@ -99,6 +102,55 @@ class ClassIdList(object):
 
         return cid_list
 
+    @staticmethod
+    def deep_parse_all(class_ids, paragraphs, jobs=1, timing=None, progress=None):
+        """
+        Deep parse a number of MEs, optionally spread across worker processes.
+        Each ME section is independent, so a worker only needs the ME and the
+        records for the paragraphs in its section.
+
+        :param class_ids: (iterable) ClassId objects, all with a section
+        :param paragraphs: (ParagraphList) Paragraph records
+        :param jobs: (int) Number of worker processes, 1 parses in this process
+        :param timing: (Timing) If enabled, the parse time of each ME is recorded.
+                       Its profiler, if any, only sees MEs parsed in this process
+        :param progress: (callable) Called with each ClassId before its parse (or,
+                         with worker processes, before waiting for its result)
+                         so that an ME that fails is the last one reported
+
+        :return: (generator) The parsed ClassId objects, in the order given.
+                 When worker processes are used these are new objects that
+                 should replace the originals.
+        """
+        timed = timing is not None and timing.enabled
+
+        if jobs <= 1:
+            for class_id in class_ids:
+                if progress is not None:
+                    progress(class_id)
+                if timing is not None:
+                    with timing.profile_scope('deep_parse', class_id.cid):
+                        class_id, elapsed = _deep_parse_worker((class_id, paragraphs, timed))
+                else:
+                    class_id, elapsed = _deep_parse_worker((class_id, paragraphs, timed))
+                if timed:
+                    timing.add_managed_entity(class_id, *elapsed)
+                yield class_id
+            return
+
+        class_ids = list(class_ids)
+        work = ((c, paragraphs.subset(c.section.paragraph_numbers), timed) for c in class_ids)
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = executor.map(_deep_parse_worker, work)
+            for class_id in class_ids:
+                if progress is not None:
+                    progress(class_id)
+                class_id, elapsed = next(results)
+                if timed:
+                    timing.add_managed_entity(class_id, *elapsed)
+                yield class_id
+
     @staticmethod
     def fix_me_table(orig_table, width):
         if orig_table.num_columns == width:
@@ -127,8 +179,7 @@ class ClassIdList(object):
                 return zip_longest(*args, fillvalue=fillvalue)
 
             for text in grouper(all_cells, table.num_columns):
-                row_data = dict(zip(table.heading, text))
-                table.rows.append(row_data)
+                table.add_row(text)
 
         except Exception as e:
             print('Table parse error in table {} - {}: {}'.format(table.doc_table_number,
@@ -194,6 +245,16 @@ class ClassId(object):
         {'trigger': 'failure', 'source': '*', 'dest': 'failure'},
     ]
 
+    # Transition table built once from the above and shared by all instances.
+    # A trigger method (normal(), attribute(), ...) is added to the class for each
+    # trigger and on_enter_<state> is called on each transition
+    STATE_TABLE = StateTable(STATES, TRANSITIONS, 'initial')
+    DISPATCH = ContentDispatch()        # Next trigger by (state parser, content category)
+
+    __slots__ = ('cid', 'name', 'section', 'parser', '_paragraphs', 'state', '_pending',
+                 '_description', '_relationships', 'attributes', 'actions', 'optional_actions',
+                 'alarms', 'avcs', 'test_results', 'hidden')
+
     def __init__(self):
         self.cid = None                   # Class Id
         self.name = None                  # Title
@@ -201,11 +262,8 @@ class ClassId(object):
 
         self.parser = initial_parser
         self._paragraphs = None
-        self.machine = Machine(model=self, states=ClassId.STATES,
-                               transitions=ClassId.TRANSITIONS,
-                               initial='initial',
-                               queued=True,
-                               name='{}-{}'.format(self.name, self.cid))
+        self.state = ClassId.STATE_TABLE.initial
+        self._pending = None              # Triggers queued during a transition
 
         # Following hold lists of paragraph numbers
         self._description = list()         # Description (paragraph numbers)
@@ -223,6 +281,35 @@ class ClassId(object):
     def __str__(self):
         return 'Class ID: {}: {}, State: {}'.format(self.cid, self.name, self.state)
 
+    def as_dict(self):
+        """
+        Parsed ME information for output. Description paragraphs are saved as
+        their text, so the deep parse must have been run.
+        """
+        paragraphs = self._paragraphs
+
+        def text(numbers):
+            return [paragraphs[n].text for n in numbers] if paragraphs is not None else numbers
+
+        alarms = self.alarms if isinstance(self.alarms, Alarm) else None
+        tcas = self.alarms if isinstance(self.alarms, ThresholdCrossingAlert) else None
+
+        return {
+            'class_id': self.cid,
+            'name': self.name,
+            'section': self.section.section_number if self.section is not None else None,
+            'state': self.state,
+            'description': text(self._description),
+            'relationships': text(self._relationships),
+            'attributes': [a.as_dict(paragraphs) for a in self.attributes],
+            'actions': [a.name for a in sorted(self.actions)],
+            'optional_actions': [a.name for a in sorted(self.optional_actions)],
+            'alarms': alarms.as_dict() if alarms is not None else None,
+            'tcas': tcas.as_dict() if tcas is not None else None,
+            'avcs': self.avcs.as_dict() if self.avcs is not None else None,
+            'hidden': self.hidden,
+        }
+
     def deep_parse(self, paragraphs):
         """ Fill out detailed class information """
         if self.section is None:
@@ -234,23 +321,22 @@ class ClassId(object):
 
                 if isinstance(content, int):
                     # Paragraph number
-                    trigger, text = self.parser(content, paragraphs)
+                    trigger, text = ClassId.DISPATCH.parse(self.parser, content, paragraphs)
 
                 elif isinstance(content, Table):
                     # Table object
                     # TODO: trigger = self.parser(content, paragraphs)
-                    trigger, text = self.parser(content, None)
+                    trigger, text = ClassId.DISPATCH.parse(self.parser, content, None)
 
                 else:
                     raise NotImplementedError('Unknown content type: {}'.
                                               format(type(content)))
                 # process info
-                getattr(self, trigger)(text, content)
+                ClassId.STATE_TABLE.trigger(self, trigger, text, content)
 
             except Exception as e:
                 self.failure(None, None)
-                print("FAILURE: During deep parsing. Content: {}: '{}'".format(content,
-                                                                               e.message))
+                print("FAILURE: During deep parsing. Content: {}: '{}'".format(content, e))
                 raise
 
         return self
@@ -390,6 +476,24 @@ class ClassId(object):
         self.parser = eos_parser
 
 
+ClassId.STATE_TABLE.add_triggers(ClassId)
+
+
+def _deep_parse_worker(work):
+    """
+    Worker process side of ClassIdList.deep_parse_all()
+
+    :return: (ClassId, tuple) The parsed ME and, if timed, its (wall, cpu) parse time
+    """
+    class_id, paragraphs, timed = work
+    if not timed:
+        return class_id.deep_parse(paragraphs), None
+
+    start = Timing.now()
+    class_id.deep_parse(paragraphs)
+    return class_id, Timing.elapsed(start)
+
+
 if __name__ == '__main__':
     """
     Run this as a program and it will produce a PNG image of the ClassID
@@ -399,8 +503,13 @@ if __name__ == '__main__':
     """
     from transitions.extensions import GraphMachine as Machine
 
-    c = ClassId()
-    machine = c.machine
+    # The 'transitions' library is only needed to draw the diagram. It
+    # is given the same states and transitions as the ClassId state table
+    machine = Machine(states=ClassId.STATES,
+                      transitions=ClassId.TRANSITIONS,
+                      initial='initial',
+                      queued=True,
+                      name='ClassID')
 
     # in cases where auto transitions should be visible
     # Machine(model=m, show_auto_transitions=True, ...)
@@ -0,0 +1,227 @@
+#
+# Copyright (c) 2018 - present.  Boling Consulting Solutions (bcsw.net)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+#   Single pass classification of ME section contents.
+#
+#   The per-state parsers in contents.py each try a chain of the text.py
+#   predicates against a paragraph or table.  Everything those predicates look
+#   at is reduced here, once per item, to a category bitmask: the header word,
+#   the style families of the paragraph style and a few text matches, or for
+#   a table its kind from the short title.  The outcome of a parser is then a
+#   function of the parser and the category only, so ContentDispatch learns it
+#   from the real parser the first time a (parser, category) pair is seen and
+#   looks it up from then on.
+#
+from __future__ import (
+    absolute_import, division, print_function, unicode_literals
+)
+from tables import Table
+from text import IGNORED_HEADINGS, EOS_HEADINGS, EOS_NORMAL_TEXT
+from styles import FAMILY_HEADING, FAMILY_NORMAL, FAMILY_NOTE, FAMILY_DESCRIPTION, \
+    FAMILY_ATTRIBUTE, FAMILY_ATTRIBUTE_LOWER, FAMILY_ATTRIBUTE_FOLLOWER, FAMILY_TOC, \
+    FAMILY_FIGURE, FAMILY_FIGURE_TITLE, FAMILY_ENUM
+
+# Header words (paragraph text, stripped).  Only one can match.
+HEADER_RELATIONSHIPS = 1 << 0
+HEADER_ATTRIBUTES = 1 << 1
+HEADER_ACTIONS = 1 << 2
+HEADER_NOTIFICATIONS = 1 << 3
+HEADER_AVCS = 1 << 4
+HEADER_ALARMS = 1 << 5
+HEADER_TESTS = 1 << 6
+
+# Style families of the paragraph style (see styles.py), shifted up
+_STYLE_SHIFT = 8
+_STYLE_FAMILIES = (FAMILY_HEADING | FAMILY_NORMAL | FAMILY_NOTE | FAMILY_DESCRIPTION |
+                   FAMILY_ATTRIBUTE | FAMILY_ATTRIBUTE_LOWER | FAMILY_ATTRIBUTE_FOLLOWER |
+                   FAMILY_TOC | FAMILY_FIGURE | FAMILY_FIGURE_TITLE | FAMILY_ENUM)
+STYLE_HEADING = FAMILY_HEADING << _STYLE_SHIFT
+STYLE_NORMAL = FAMILY_NORMAL << _STYLE_SHIFT
+
+# Text matches, only looked for with the style family that the predicates check
+TEXT_IGNORED_HEADING = 1 << 20      # Heading
+TEXT_EOS_HEADING = 1 << 21          # Heading
+TEXT_EOS_NORMAL = 1 << 22           # Normal
+TEXT_MULTICAST = 1 << 23            # Heading, see 9.2.5
+TEXT_INPMIN = 1 << 24               # Heading, see 9.7.7
+
+# Tables (by short title)
+TABLE = 1 << 28
+TABLE_AVCS = 1 << 29
+TABLE_ALARMS = 1 << 30
+TABLE_TCA = 1 << 31
+TABLE_TESTS = 1 << 32
+
+_HEADERS = {
+    'Relationships': HEADER_RELATIONSHIPS,
+    'Attributes': HEADER_ATTRIBUTES,
+    'Actions': HEADER_ACTIONS,
+    'Notifications': HEADER_NOTIFICATIONS,
+    'Attribute Value Change': HEADER_AVCS,
+    'Alarm': HEADER_ALARMS,
+    'Test Result': HEADER_TESTS,
+}
+
+_TABLES = (
+    ('attribute value change', TABLE_AVCS),
+    ('alarm', TABLE_ALARMS),
+    ('threshold crossing alert', TABLE_TCA),
+    ('TODO: Test results not yet supported', TABLE_TESTS),
+)
+
+
+def paragraph_category(paragraph):
+    """ Category bitmask of a paragraph record, computed once per record """
+    category = paragraph.category
+
+    if category is None:
+        features = paragraph.features
+        category = (paragraph.style.family & _STYLE_FAMILIES) << _STYLE_SHIFT | \
+            _HEADERS.get(features.stripped, 0)
+        prefix = features.prefix
+
+        if category & STYLE_HEADING:
+            if any(x in prefix for x in IGNORED_HEADINGS):
+                category |= TEXT_IGNORED_HEADING
+            if any(x in prefix for x in EOS_HEADINGS):
+                category |= TEXT_EOS_HEADING
+            if 'Multicast interworking GEM ' in features.text or \
+                    'Discovery of multicast ' in features.text:
+                category |= TEXT_MULTICAST
+            if 'Value\tINPmin' in features.text:
+                category |= TEXT_INPMIN
+
+        if category & STYLE_NORMAL and any(x in prefix for x in EOS_NORMAL_TEXT):
+            category |= TEXT_EOS_NORMAL
+
+        paragraph.category = category
+
+    return category
+
+
+def table_category(table):
+    """ Category bitmask of a table, None if it has no short title to classify by """
+    title = table.short_title
+    if title is None:
+        return None
+
+    category = TABLE
+    lower = title.lower()
+    for phrase, bit in _TABLES:
+        if phrase == lower[:len(phrase)]:
+            category |= bit
+    return category
+
+
+class ContentDispatch(object):
+    """
+    Next trigger and text for an ME content item from a (parser, category)
+    lookup instead of running the parser's predicate chain.
+
+    Each entry is learned from the parser itself the first time its
+    (parser, category) pair is seen.  Items that cannot be classified (a
+    table without a short title, other content), parsers that raise and
+    parsers that do not return a (trigger, text) pair are always handed to
+    the parser.  With 'verify' set, every lookup is also checked against
+    the parser.
+    """
+    def __init__(self, verify=False):
+        self.enabled = True
+        self.verify = verify
+        self._table = dict()        # Key -> parser, Value -> dict of category -> entry
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._table.values())
+
+    def clear(self):
+        self._table = dict()
+
+    @staticmethod
+    def category(content, paragraphs):
+        """ Category bitmask of a content item, None if it cannot be classified """
+        if isinstance(content, int):
+            paragraph = paragraphs[content]
+            category = paragraph.category
+            return category if category is not None else paragraph_category(paragraph)
+
+        if isinstance(content, Table):
+            return table_category(content)
+        return None
+
+    def has_entry(self, parser, category):
+        """ True if the result for a (parser, category) pair has been learned """
+        entries = self._table.get(parser)
+        return entries is not None and category in entries
+
+    def parse(self, parser, content, paragraphs):
+        """
+        :param parser: (function) Parser of the current state, see contents.py
+        :param content: (int) or (Table)
+        :param paragraphs: (ParagraphList) Paragraph records
+
+        :return: Same result as parser(content, paragraphs)
+        """
+        if not self.enabled:
+            return parser(content, paragraphs)
+
+        if isinstance(content, int):
+            paragraph = paragraphs[content]
+            category = paragraph.category
+            if category is None:
+                category = paragraph_category(paragraph)
+
+        elif isinstance(content, Table):
+            paragraph = None
+            category = table_category(content)
+            if category is None:
+                return parser(content, paragraphs)
+        else:
+            return parser(content, paragraphs)
+
+        entries = self._table.get(parser)
+        if entries is None:
+            entries = dict()
+            self._table[parser] = entries
+
+        # An entry is either the (trigger, None) result itself or, if the
+        # parser returned the paragraph text, just the trigger
+        entry = entries.get(category)
+
+        if entry is None:
+            result = parser(content, paragraphs)
+            entry = ContentDispatch._entry(result, paragraph)
+            if entry is not None:
+                entries[category] = entry
+            return result
+
+        result = entry if entry.__class__ is tuple else (entry, paragraph.features.text)
+
+        if self.verify:
+            expected = parser(content, paragraphs)
+            assert result == expected, \
+                'Dispatch of {} for {} gave {}, expected {}'.format(parser.__name__, content,
+                                                                   result, expected)
+        return result
+
+    @staticmethod
+    def _entry(result, paragraph):
+        if not isinstance(result, tuple) or len(result) != 2:
+            return None             # Parsers that return a bare 'failure'
+
+        trigger, text = result
+        if text is None:
+            return result
+
+        assert paragraph is not None and text == paragraph.features.text, \
+            'Parser text is not the paragraph text'
+        return trigger
@@ -28,7 +28,7 @@ def initial_parser(content, paragraphs):
         - Description    - if 'normal' text style
 
     :param content: (int) or (Table)
-    :param paragraphs: (list) Docx Paragraphs
+    :param paragraphs: (ParagraphList) Paragraph records
 
     :return: (str, str) Next state, Associated text (if any)
     """
@@ -42,10 +42,10 @@ def initial_parser(content, paragraphs):
             return 'attribute', None
 
         elif is_description_style(paragraph.style):
-            return 'description', ascii_only(paragraph.text)
+            return 'description', paragraph.features.text
 
         elif is_normal_style(paragraph.style):
-            return 'normal', ascii_only(paragraph.text)
+            return 'normal', paragraph.features.text
 
     return 'failure', None
 
@@ -60,7 +60,7 @@ def description_parser(content, paragraphs):
         - Description    - if 'normal' text style
 
     :param content: (int) or (Table)
-    :param paragraphs: (list) Docx Paragraphs
+    :param paragraphs: (ParagraphList) Paragraph records
 
     :return: (str, str) Next state, Associated text (if any)
     """
@@ -76,7 +76,7 @@ def description_parser(content, paragraphs):
         elif is_description_text(paragraph) or \
                 is_ignored_heading(paragraph) or \
                 is_enum_style(paragraph.style):
-            return 'normal', ascii_only(paragraph.text)
+            return 'normal', paragraph.features.text
     else:
         # TODO: Look at 9.1.7 ONU Power shedding ME. Has table in description
         #       that may be of interest.
@@ -94,7 +94,7 @@ def relationships_parser(content, paragraphs):
         - Relationships  - if 'normal' text style
 
     :param content: (int) or (Table)
-    :param paragraphs: (list) Docx Paragraphs
+    :param paragraphs: (ParagraphList) Paragraph records
 
     :return: (str, str) Next state, Associated text (if any)
     """
@@ -107,7 +107,7 @@ def relationships_parser(content, paragraphs):
         elif is_relationships_text(paragraph) or \
                 is_figure_style(paragraph.style) or \
                 is_figure_title_style(paragraph.style):
-            return 'normal', ascii_only(paragraph.text)
+            return 'normal', paragraph.features.text
     else:
         # TODO: Implement if needed, otherwise remove and fall through
         raise NotImplementedError('Table support')
@@ -124,7 +124,7 @@ def attributes_parser(content, paragraphs):
         - Attributes    - if 'normal' text style
 
     :param content: (int) or (Table)
-    :param paragraphs: (list) Docx Paragraphs
+    :param paragraphs: (ParagraphList) Paragraph records
 
     :return: (str, str) Next state, Associated text (if any)
     """
@@ -135,7 +135,7 @@ def attributes_parser(content, paragraphs):
             return 'action', None
 
         elif is_attribute_text(paragraph):
-            return 'normal', ascii_only(paragraph.text)
+            return 'normal', paragraph.features.text
 
         elif is_normal_style(paragraph.style) or \
                 is_figure_style(paragraph.style) or \
@@ -159,7 +159,7 @@ def actions_parser(content, paragraphs):
         - Action        - if 'normal' text style
 
     :param content: (int) or (Table)
-    :param paragraphs: (list) Docx Paragraphs
+    :param paragraphs: (ParagraphList) Paragraph records
 
     :return: (str, str) Next state, Associated text (if any)
     """
@@ -170,7 +170,7 @@ def actions_parser(content, paragraphs):
             return 'notification', None
 
         elif is_actions_text(paragraph):
-            return 'normal', ascii_only(paragraph.text)
+            return 'normal', paragraph.features.text
 
         elif is_normal_style(paragraph.style):
             # Before start of some actions, some descriptive
@@ -198,7 +198,7 @@ def notifications_parser(content, paragraphs):
         - Notifications - if 'normal' text style
 
     :param content: (int) or (Table)
-    :param paragraphs: (list) Docx Paragraphs
+    :param paragraphs: (ParagraphList) Paragraph records
 
     :return: (str, str) Next state, Associated text (if any)
     """
@@ -209,16 +209,16 @@ def notifications_parser(content, paragraphs):
             return 'avc', None
 
         elif is_alarms_header(paragraph):
-            return 'alarm', ascii_only(paragraph.text)
+            return 'alarm', paragraph.features.text
 
         elif is_tests_header(paragraph):
-            return 'test', ascii_only(paragraph.text)
+            return 'test', paragraph.features.text
 
         elif is_eos_heading(paragraph):
             return 'end_of_section', None
 
         elif is_notifications_text(paragraph):
-            return 'normal', ascii_only(paragraph.text)
+            return 'normal', paragraph.features.text
 
     elif isinstance(content, Table):
         if is_avcs_table(content):
@@ -244,7 +244,7 @@ def alarms_parser(content, paragraphs):
     Parse content for this state of an ME
 
     :param content: (int) or (Table)
-    :param paragraphs: (list) Docx Paragraphs
+    :param paragraphs: (ParagraphList) Paragraph records
 
     :return: (str, str) Next state, Associated text (if any)
     """
@@ -255,10 +255,10 @@ def alarms_parser(content, paragraphs):
             return 'avc', None
 
         elif is_tests_header(paragraph):
-            return 'test', ascii_only(paragraph.text)
+            return 'test', paragraph.features.text
 
         elif is_alarms_text(paragraph):
-            return 'normal', ascii_only(paragraph.text)
+            return 'normal', paragraph.features.text
 
     elif isinstance(content, Table):
         if is_avcs_table(content):
@@ -280,7 +280,7 @@ def avcs_parser(content, paragraphs):
     Parse content for this state of an ME
 
     :param content: (int) or (Table)
-    :param paragraphs: (list) Docx Paragraphs
+    :param paragraphs: (ParagraphList) Paragraph records
 
     :return: (str, str) Next state, Associated text (if any)
     """
@@ -288,10 +288,10 @@ def avcs_parser(content, paragraphs):
         paragraph = paragraphs[content]
 
         if is_alarms_header(paragraph):
-            return 'alarm', ascii_only(paragraph.text)
+            return 'alarm', paragraph.features.text
 
         elif is_tests_header(paragraph):
-            return 'test', ascii_only(paragraph.text)
+            return 'test', paragraph.features.text
 
         elif is_eos_heading(paragraph):
             return 'end_of_section', None
@@ -300,7 +300,7 @@ def avcs_parser(content, paragraphs):
                 is_normal_style(paragraph.style) or \
                 is_enum_style(paragraph.style) or \
                 is_ignored_heading(paragraph):
-            return 'normal', ascii_only(paragraph.text)
+            return 'normal', paragraph.features.text
 
     elif isinstance(content, Table):
         if is_alarms_table(content):
@@ -320,7 +320,7 @@ def tests_parser(content, paragraphs):
     Parse content for this state of an ME
 
     :param content: (int) or (Table)
-    :param paragraphs: (list) Docx Paragraphs
+    :param paragraphs: (ParagraphList) Paragraph records
 
     :return: (str, str) Next state, Associated text (if any)
     """
@@ -331,10 +331,10 @@ def tests_parser(content, paragraphs):
             return 'avc', None
 
         elif is_alarms_header(paragraph):
-            return 'alarm', ascii_only(paragraph.text)
+            return 'alarm', paragraph.features.text
 
         elif is_tests_text(paragraph):
-            return 'normal', ascii_only(paragraph.text)
+            return 'normal', paragraph.features.text
 
     elif isinstance(content, Table):
         if is_avcs_table(content):
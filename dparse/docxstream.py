@@ -0,0 +1,414 @@
+#
+# Copyright (c) 2018 - present.  Boling Consulting Solutions (bcsw.net)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+#   Streaming reader for the body of a .docx document.
+#
+#   Rather than loading the full python-docx object model, the main document
+#   part is read straight out of the zip package with an incremental lxml parse.
+#   Each body level paragraph and table is converted into a lightweight object
+#   as soon as its closing tag is seen and the XML is then discarded, so memory
+#   stays bounded no matter how large the document is.
+#
+#   The objects yielded provide the small subset of the python-docx Paragraph
+#   and Table API used by the pre-parser (text, style name/builtin, columns,
+#   rows and row cells) and follow the python-docx (0.8.x) rules for each so
+#   that the pre-compiled output is the same as when python-docx is used.
+#
+from __future__ import (
+    absolute_import, division, print_function, unicode_literals
+)
+import posixpath
+import zipfile
+from lxml import etree
+from styles import StyleTable
+
+_W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+_PKG_RELS_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+_RT_OFFICE_DOCUMENT = \
+    'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+_RT_STYLES = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles'
+
+
+def qn(tag):
+    """ Clark notation name for a 'w:' prefixed WordprocessingML tag/attribute """
+    return '{{{}}}{}'.format(_W_NS, tag)
+
+
+W_BODY = qn('body')
+W_P = qn('p')
+W_R = qn('r')
+W_T = qn('t')
+W_TAB = qn('tab')
+W_BR = qn('br')
+W_CR = qn('cr')
+W_RPR = qn('rPr')
+W_B = qn('b')
+W_PPR = qn('pPr')
+W_PSTYLE = qn('pStyle')
+W_TBL = qn('tbl')
+W_TBLGRID = qn('tblGrid')
+W_GRIDCOL = qn('gridCol')
+W_TR = qn('tr')
+W_TC = qn('tc')
+W_TCPR = qn('tcPr')
+W_GRIDSPAN = qn('gridSpan')
+W_VMERGE = qn('vMerge')
+W_STYLE = qn('style')
+W_NAME = qn('name')
+W_VAL = qn('val')
+W_TYPE = qn('type')
+W_STYLE_ID = qn('styleId')
+W_DEFAULT = qn('default')
+W_CUSTOM_STYLE = qn('customStyle')
+
+# Built-in styles whose internal (styles.xml) name differs from the UI name
+# that python-docx reports.
+_UI_STYLE_NAMES = {
+    'caption': 'Caption',
+    'footer': 'Footer',
+    'header': 'Header',
+}
+_UI_STYLE_NAMES.update({'heading {}'.format(n): 'Heading {}'.format(n) for n in range(1, 10)})
+
+
+def _on_off(value, default=False):
+    """ Decode an ST_OnOff attribute value """
+    if value is None:
+        return default
+    return value in ('1', 'true', 'on')
+
+
+def _part_relationships(package, part_name):
+    """ Map of relationship type -> target part name for the given part """
+    rels_name = posixpath.join(posixpath.dirname(part_name), '_rels',
+                               posixpath.basename(part_name) + '.rels')
+    try:
+        root = etree.fromstring(package.read(rels_name))
+    except KeyError:
+        return dict()
+
+    base = posixpath.dirname(part_name)
+    results = dict()
+    for rel in root.iterchildren('{{{}}}Relationship'.format(_PKG_RELS_NS)):
+        if rel.get('TargetMode') == 'External':
+            continue
+        target = rel.get('Target')
+        if target.startswith('/'):
+            target = target[1:]
+        else:
+            target = posixpath.normpath(posixpath.join(base, target))
+        results.setdefault(rel.get('Type'), target)
+    return results
+
+
+def read_styles(xml, styles):
+    """
+    Add the styles of a styles.xml part to a style table
+
+    :param xml: (bytes) styles.xml, or None if the document has none
+    :param styles: (StyleTable) Table to add to
+    :return: (StyleTable)
+    """
+    if xml is None:
+        return styles
+
+    for elem in etree.fromstring(xml).iterchildren(W_STYLE):
+        name_elem = elem.find(W_NAME)
+        name = name_elem.get(W_VAL) if name_elem is not None else None
+
+        styles.add(elem.get(W_STYLE_ID), _UI_STYLE_NAMES.get(name, name),
+                   not _on_off(elem.get(W_CUSTOM_STYLE)),
+                   paragraph=elem.get(W_TYPE, 'paragraph') == 'paragraph',
+                   default=_on_off(elem.get(W_DEFAULT)))
+    return styles
+
+
+def _run_text(elem):
+    """ Text of a w:r element """
+    text = ''
+    for child in elem.iterchildren():
+        if child.tag == W_T:
+            text += child.text or ''
+        elif child.tag == W_TAB:
+            text += '\t'
+        elif child.tag in (W_BR, W_CR):
+            text += '\n'
+    return text
+
+
+def _style_id(elem):
+    """ Style ID of a w:p element, None if not set """
+    ppr = elem.find(W_PPR)
+    if ppr is not None:
+        pstyle = ppr.find(W_PSTYLE)
+        if pstyle is not None:
+            return pstyle.get(W_VAL)
+    return None
+
+
+class StreamRun(object):
+    """ Text and bold setting of a run """
+    def __init__(self, text, bold):
+        self.text = text
+        self.bold = bold        # True/False if set directly on the run, else None
+
+    @staticmethod
+    def create(elem):
+        bold = None
+        rpr = elem.find(W_RPR)
+        if rpr is not None:
+            b = rpr.find(W_B)
+            if b is not None:
+                bold = _on_off(b.get(W_VAL), default=True)
+
+        return StreamRun(_run_text(elem), bold)
+
+
+class StreamParagraph(object):
+    """ Text, runs and style of a paragraph """
+    def __init__(self, runs, style):
+        self.runs = runs
+        self.text = ''.join(r.text for r in runs)
+        self.style = style
+
+    @staticmethod
+    def create(elem, styles):
+        runs = [StreamRun.create(r) for r in elem.iterchildren(W_R)]
+        return StreamParagraph(runs, styles.get(_style_id(elem)))
+
+
+class StreamCell(object):
+    """
+    Text and first paragraph style of a table cell. The text is that of each
+    paragraph, joined by newlines
+    """
+    def __init__(self, text, style):
+        self.text = text
+        self.style = style          # (ParagraphStyle) None if the cell has no paragraphs
+
+    @staticmethod
+    def create(elem, styles):
+        texts, style = list(), None
+        for p in elem.iterchildren(W_P):
+            if not texts:
+                style = styles.get(_style_id(p))
+            texts.append(''.join(_run_text(r) for r in p.iterchildren(W_R)))
+
+        return StreamCell('\n'.join(texts), style)
+
+
+class StreamRow(object):
+    """ A table row; cells are repeated for each grid column they span """
+    def __init__(self, cells):
+        self.cells = cells
+
+    @property
+    def family(self):
+        """ Style families (see styles.py) of the first paragraph of all its cells """
+        family = 0
+        for cell in self.cells:
+            if cell.style is not None:
+                family |= cell.style.family
+        return family
+
+
+class StreamTable(object):
+    """
+    Logical cell grid of a table, read from the w:tbl XML in a single pass.
+
+    This is used for python-docx tables as well (see Table.create) so that
+    the text and style of each cell are only worked out once, however many
+    grid columns or rows it spans.
+
+    The cells of each row are laid out exactly as python-docx does: all
+    cells of the table are placed into one list (repeating cells that
+    span several grid columns or continue a vertical merge) which is then
+    sliced into rows the width of the table grid.
+    """
+    def __init__(self, num_columns, rows, element=None):
+        self.columns = range(num_columns)
+        self.rows = rows
+        self.element = element      # Table XML, only valid until the next block is read
+        self.xml = None             # Serialized table XML, once detached
+
+    def detach(self):
+        """
+        Keep the serialized table XML and drop the element, so the table stays
+        valid after the next block is read and can be passed to another process
+        """
+        if self.element is not None:
+            self.xml = etree.tostring(self.element)
+            self.element = None
+        return self
+
+    @staticmethod
+    def create(elem, styles):
+        """
+        :param elem: (Element) w:tbl
+        :param styles: (StyleTable) Styles of the document
+        :return: (StreamTable)
+        """
+        grid = elem.find(W_TBLGRID)
+        col_count = len(grid.findall(W_GRIDCOL)) if grid is not None else 0
+        trs = elem.findall(W_TR)
+
+        cells = list()
+        for tr in trs:
+            for tc in tr.iterchildren(W_TC):
+                span, vmerge = 1, None
+                tcpr = tc.find(W_TCPR)
+                if tcpr is not None:
+                    grid_span = tcpr.find(W_GRIDSPAN)
+                    if grid_span is not None:
+                        span = int(grid_span.get(W_VAL))
+                    v_merge = tcpr.find(W_VMERGE)
+                    if v_merge is not None:
+                        vmerge = v_merge.get(W_VAL, 'continue')
+
+                if vmerge == 'continue':
+                    for _ in range(span):
+                        cells.append(cells[-col_count])
+                else:
+                    cell = StreamCell.create(tc, styles)
+                    cells.extend([cell] * span)
+
+        rows = [StreamRow(tuple(cells[n * col_count:(n + 1) * col_count]))
+                for n in range(len(trs))]
+
+        return StreamTable(col_count, rows, element=elem)
+
+
+class StreamDocument(object):
+    """
+    A .docx document whose body is read a block at a time
+
+    Only one body block is held in memory at a time (other than what the
+    caller decides to keep)
+    """
+    def __init__(self, source_file):
+        self.source_file = source_file
+        self.styles = StyleTable()
+        self._package = None            # (ZipFile) Once opened
+        self._document_part = None
+
+    def open(self):
+        """
+        Open the package and read its styles. Done when the body is first
+        read if not called before then
+        """
+        if self._package is not None:
+            return self
+
+        package = zipfile.ZipFile(self.source_file)
+        try:
+            document_part = _part_relationships(package, '').get(_RT_OFFICE_DOCUMENT,
+                                                                 'word/document.xml')
+            styles_part = _part_relationships(package, document_part).get(_RT_STYLES)
+            try:
+                styles_xml = package.read(styles_part) if styles_part is not None else None
+            except KeyError:
+                styles_xml = None
+
+            self.styles = read_styles(styles_xml, StyleTable())
+
+        except Exception:
+            package.close()
+            raise
+
+        self._package, self._document_part = package, document_part
+        return self
+
+    def close(self):
+        if self._package is not None:
+            self._package.close()
+            self._package = None
+
+    def iter_block_items(self, start=0, stop=None):
+        """
+        Generate a StreamParagraph or StreamTable for each paragraph or table
+        child of the document body, in document order.
+
+        :param start: (int) First body block, the blocks before it are skipped
+                      without being read
+        :param stop: (int) Body block to stop before, None for the end of the body
+        """
+        return self.iter_block_ranges([(start, stop)])
+
+    def iter_block_ranges(self, ranges):
+        """
+        Generate the paragraphs and tables of some ranges of the document body.
+        Blocks outside of the ranges are skipped without being read, and the
+        body is not read any further once the last range is done.
+
+        :param ranges: (list) (start, stop) body block numbers, in document
+                       order. A stop of None is the end of the body
+        """
+        ranges = iter(ranges)
+        current = next(ranges, None)
+
+        for bnum, elem in enumerate(self._iter_body()):
+            while current is not None and current[1] is not None and bnum >= current[1]:
+                current = next(ranges, None)
+            if current is None:
+                return
+            if bnum < current[0]:
+                continue
+
+            if elem.tag == W_P:
+                yield StreamParagraph.create(elem, self.styles)
+            else:
+                yield StreamTable.create(elem, self.styles)
+
+    def iter_headings(self, family):
+        """
+        Quick pass over the document body for the paragraphs of a style family,
+        the other blocks are only counted
+
+        :param family: (int) Style family bits, see styles.py
+        :return: (generator) (block number, paragraph number, table number,
+                 StreamParagraph) of each paragraph with text and a style in
+                 the family, then (block, paragraph, table) counts for the
+                 whole body with None
+        """
+        bnum, pnum, tnum = 0, 0, 0
+
+        for bnum, elem in enumerate(self._iter_body(), start=1):
+            if elem.tag == W_P:
+                style = self.styles.get(_style_id(elem))
+                if style is not None and style.family & family:
+                    paragraph = StreamParagraph.create(elem, self.styles)
+                    if len(paragraph.text):
+                        yield bnum - 1, pnum, tnum, paragraph
+                pnum += 1
+            else:
+                tnum += 1
+
+        yield bnum, pnum, tnum, None
+
+    def _iter_body(self):
+        """ Each w:p or w:tbl child of the document body, cleared once the next is read """
+        self.open()
+
+        with self._package.open(self._document_part) as xml:
+            for _event, elem in etree.iterparse(xml, events=('end',),
+                                                tag=(W_P, W_TBL)):
+                parent = elem.getparent()
+                if parent is None or parent.tag != W_BODY:
+                    continue        # Nested within a table or other block
+
+                yield elem
+
+                # Done with this block and anything before it
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del parent[0]
@@ -36,4 +36,5 @@ fi
 . ${VENVDIR}/bin/activate
 
 # add top-level parser dir to pythonpath
-export PYTHONPATH=${PARSER_BASE}/${VENVDIR}/lib/python3.5/site-packages:${PYTHONPATH}:${PARSER_BASE}
+PYTHON_VERSION=$(python -c 'import sys; print("python{}.{}".format(*sys.version_info[:2]))')
+export PYTHONPATH=${PARSER_BASE}/${VENVDIR}/lib/${PYTHON_VERSION}/site-packages:${PYTHONPATH}:${PARSER_BASE}
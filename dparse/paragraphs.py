@@ -0,0 +1,170 @@
+#
+# Copyright (c) 2018 - present.  Boling Consulting Solutions (bcsw.net)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from __future__ import (
+    absolute_import, division, print_function, unicode_literals
+)
+from text import ascii_only, ParagraphFeatures
+from styles import ParagraphStyle
+
+
+class ParagraphRecord(object):
+    """
+    Snapshot of the paragraph information needed to deep parse an ME
+    so that the original document does not need to be reloaded
+    """
+    def __init__(self, text, style, bold_text=None):
+        self.text = text                # (str) ASCII only paragraph text
+        self.style = style              # (ParagraphStyle) Paragraph style
+        self.bold_text = bold_text      # (str) ASCII only text of the bold runs if the
+                                        #       paragraph starts with a bold run, else None
+        self.category = None            # (int) Category bitmask, see classify.py
+        self._features = None
+
+    def __str__(self):
+        return 'Paragraph: {}: {}'.format(self.style.name, self.text)
+
+    @property
+    def features(self):
+        """ (ParagraphFeatures) Normalized text and style, computed on first use """
+        if self._features is None:
+            self._features = ParagraphFeatures.create(self)
+        return self._features
+
+    @staticmethod
+    def create(paragraph, style=None):
+        """
+        Create a record from a paragraph
+
+        :param paragraph: (Paragraph) Docx or stream paragraph
+        :param style: (ParagraphStyle) Style of the paragraph if already known,
+                      see StyleTable.style_of()
+        :return: (ParagraphRecord)
+        """
+        runs = paragraph.runs
+        bold_text = None
+
+        if len(runs) and runs[0].bold:
+            bold_text = ascii_only(' '.join(x.text for x in runs if x.bold))
+
+        if style is None:
+            style = ParagraphStyle.create(paragraph.style.name, paragraph.style.builtin)
+
+        return ParagraphRecord(ascii_only(paragraph.text), style, bold_text)
+
+
+class ParagraphList(object):
+    """ Paragraph records of a document, keyed by document paragraph number """
+    def __init__(self):
+        self._paragraphs = dict()     # Key -> (int) paragraph number, Value -> (ParagraphRecord)
+
+    def __getitem__(self, item):
+        return self._paragraphs[item]  # delegate to dict.__getitem__
+
+    def __iter__(self):
+        for number in self._paragraphs:
+            yield number
+
+    def __len__(self):
+        return len(self._paragraphs)
+
+    def __contains__(self, item):
+        return item in self._paragraphs
+
+    def add(self, number, record):
+        assert isinstance(record, ParagraphRecord), 'Invalid type'
+        self._paragraphs[number] = record
+        return self
+
+    def get(self, number):
+        return self._paragraphs.get(number)
+
+    def items(self):
+        return self._paragraphs.items()
+
+    def subset(self, numbers):
+        """ New list with just the records for the given paragraph numbers """
+        records = ParagraphList()
+        for number in numbers:
+            records._paragraphs[number] = self._paragraphs[number]
+        return records
+
+    @staticmethod
+    def create(paragraphs, numbers, styles=None):
+        """
+        Create records for the requested paragraphs of a docx document
+
+        :param paragraphs: (list) Docx paragraphs
+        :param numbers: (iterable) paragraph numbers to record
+        :param styles: (StyleTable) Styles of the document
+        :return: (ParagraphList)
+        """
+        records = ParagraphList()
+        for number in numbers:
+            paragraph = paragraphs[number]
+            style = styles.style_of(paragraph) if styles is not None else None
+            records.add(number, ParagraphRecord.create(paragraph, style))
+        return records
+
+    def as_dict(self):
+        """
+        Compact form for saving. Styles are saved once and referenced by
+        their index in the style list by each paragraph entry
+        """
+        styles = list()
+        paragraphs = self.as_list(sorted(self._paragraphs), styles, dict())
+
+        return {
+            'styles': styles,
+            'paragraphs': paragraphs,
+        }
+
+    def as_list(self, numbers, styles, style_index):
+        """
+        Paragraph entries for the given paragraph numbers. Styles not yet
+        in the (shared) style list are appended to it.
+
+        :param numbers: (iterable) paragraph numbers to save
+        :param styles: (list) [name, builtin] of each style
+        :param style_index: (dict) Key -> (ParagraphStyle), Value -> index in styles
+        :return: (list) [number, style index, text, bold text] entries
+        """
+        paragraphs = list()
+
+        for number in numbers:
+            record = self._paragraphs[number]
+            index = style_index.get(record.style)
+            if index is None:
+                index = len(styles)
+                style_index[record.style] = index
+                styles.append([record.style.name, record.style.builtin])
+
+            paragraphs.append([number, index, record.text, record.bold_text])
+
+        return paragraphs
+
+    def add_list(self, entries, styles):
+        """
+        Add the records for paragraph entries saved by as_list()
+
+        :param entries: (list) [number, style index, text, bold text] entries
+        :param styles: (list) (ParagraphStyle) for each style index
+        """
+        for number, index, text, bold_text in entries:
+            self.add(number, ParagraphRecord(text, styles[index], bold_text))
+        return self
+
+    @staticmethod
+    def load_dict(data):
+        styles = [ParagraphStyle.create(name, builtin) for name, builtin in data['styles']]
+        return ParagraphList().add_list(data['paragraphs'], styles)
@@ -19,32 +19,85 @@ import argparse
 from docx import Document
 
 from section import SectionList
-from class_id import ClassIdList
+from paragraphs import ParagraphList
+from styles import StyleTable
+import contents
+from class_id import ClassIdList, ClassId
 from text import camelcase
+from timing import Timing
+from profiling import Profiler
+from rules import RuleCounters
+from writer import MEWriter, ShardedMEWriter, FORMATS
+from profiles import att_openomci
 
 
 MEClassSection = "11.2.4"       # Class IDs
 
+# Stages reported by --timing and that --profile-stage can select
+STAGES = ('load', 'paragraphs_load', 'class_id_extraction', 'deep_parse_all', 'deep_parse',
+          'write', 'validation')
+
 
 def parse_args():
     parser = argparse.ArgumentParser(description='G.988 Final Parser')
 
     parser.add_argument('--ITU', '-I', action='store',
                         default='ITU-T G.988-201711.docx',
-                        help='Path to ITU G.988 specification document')
+                        help='Path to ITU G.988 specification document. Only needed if '
+                             'the pre-parsed data does not contain paragraph information')
 
     parser.add_argument('--input', '-i', action='store',
                         default='G.988.PreCompiled.json',
-                        help='Path to pre-parsed G.988 data, default: G.988.PreCompiled.json')
+                        help='Path to pre-parsed G.988 data (JSON or binary), '
+                             'default: G.988.PreCompiled.json')
 
     parser.add_argument('--output', '-o', action='store',
                         default='G.988.Parsed.json',
                         help='Output filename, default: G.988.Parsed.json')
 
+    parser.add_argument('--format', '-f', action='store', default='json',
+                        choices=FORMATS,
+                        help='Output format, a single JSON document or newline-delimited '
+                             'JSON with one ME per line, default: json')
+
+    parser.add_argument('--shards', '-s', action='store', default=None, metavar='DIR',
+                        help='Also write each ME to its own file in this directory, with '
+                             'an index of their class IDs, names, sections and content '
+                             'hashes. Unchanged files are not rewritten')
+
     parser.add_argument('--classes', '-c', action='store',
                         default='11.2.4',
                         help='Document section number with ME Class IDs, default: 11.2.4')
 
+    parser.add_argument('--jobs', '-j', action='store', type=int, default=1,
+                        help='Number of worker processes used to parse MEs, default: 1')
+
+    parser.add_argument('--timing', '-t', action='store', nargs='?',
+                        const='parser.timing.json', default=None, metavar='REPORT',
+                        help='Save stage and per-ME timing and counts to a JSON report, '
+                             'default: parser.timing.json')
+
+    parser.add_argument('--profile', '-p', action='store', nargs='?',
+                        const='parser.profile', default=None, metavar='PREFIX',
+                        help='Profile the run and save PREFIX.pstats and PREFIX.collapsed '
+                             '(flame graph stacks), default: parser.profile')
+
+    parser.add_argument('--profile-stage', action='append', default=None,
+                        choices=STAGES, metavar='STAGE',
+                        help='Only profile this stage (may be repeated): {}'.
+                        format(', '.join(STAGES)))
+
+    parser.add_argument('--profile-cids', action='store', default=None, metavar='CIDS',
+                        type=lambda value: [int(cid) for cid in value.split(',')],
+                        help='Only profile the deep parse of these comma separated ME '
+                             'class IDs')
+
+    parser.add_argument('--rules', '-r', action='store', nargs='?',
+                        const='parser.rules.json', default=None, metavar='REPORT',
+                        help='Count calls, hits and time of the content classification '
+                             'predicates, state transitions and dispatch table lookups '
+                             'and save them to a JSON report, default: parser.rules.json')
+
     args = parser.parse_args()
     return args
 
@@ -57,25 +110,75 @@ class Main(object):
         self.sections = None
         self.class_ids = None
         self.body = None
+        self.profiler = None
+
+        if self.args.profile is not None or self.args.profile_stage or self.args.profile_cids:
+            self.profiler = Profiler(self.args.profile or 'parser.profile',
+                                     stages=self.args.profile_stage,
+                                     class_ids=self.args.profile_cids)
+
+        self.timing = Timing('parser', enabled=self.args.timing is not None,
+                             profiler=self.profiler)
 
     def load_itu_document(self):
         return Document(self.args.ITU)
 
-    def start(self):
-        print("Loading ITU Document '{}' and parsed data file '{}'".format(self.args.ITU,
-                                                                           self.args.input))
+    def load_paragraphs(self):
+        """
+        Paragraph records for all sections. Older pre-parsed data files do
+        not contain them so they are created from the ITU document instead
+        """
+        if self.sections.has_paragraphs:
+            return self.sections.paragraphs
+
+        print("Pre-parsed data has no paragraph information, loading ITU Document '{}'".
+              format(self.args.ITU))
         document = self.load_itu_document()
-        self.sections = SectionList()
-        self.sections.load(self.args.input)
+        numbers = {p for section in self.sections for p in section.paragraph_numbers}
+
+        return ParagraphList.create(document.paragraphs, numbers,
+                                    styles=StyleTable.create(document.styles))
+
+    @staticmethod
+    def print_progress(c):
+        print('    {:>9}:  {:>4}: {} -> {}'.format(c.section.section_number,
+                                                   c.cid,
+                                                   c.name,
+                                                   camelcase(c.name)))
+
+    def start(self):
+        try:
+            if self.profiler is not None:
+                self.profiler.start()
+            self._start()
+
+        finally:
+            if self.profiler is not None:
+                self.profiler.stop()
+                for filepath in self.profiler.save():
+                    print('Saved profile to {}'.format(filepath))
+
+            if self.timing.enabled:
+                print('Saving timing report to {}'.format(self.args.timing))
+                self.timing.save(self.args.timing)
+
+    def _start(self):
+        timing = self.timing
+
+        print("Loading parsed data file '{}'".format(self.args.input))
+        with timing.stage('load'):
+            self.sections = SectionList()
+            self.sections.load(self.args.input)
 
-        self.paragraphs = document.paragraphs
-        # doc_sections = document.sections
-        # styles = document.styles
-        # self.body = document.element.body
+        with timing.stage('paragraphs_load'):
+            self.paragraphs = self.load_paragraphs()
 
         print('Extracting ME Class ID values')
-        self.class_ids = ClassIdList.parse_sections(self.sections,
-                                                    self.args.classes)
+        with timing.stage('class_id_extraction'):
+            self.class_ids = ClassIdList.parse_sections(self.sections,
+                                                        self.args.classes)
+        timing.count('class_ids', len(self.class_ids))
+        timing.count('sections', len(self.sections))
 
         print('Found {} ME Class ID entries. {} have sections associated to them'.
               format(len(self.class_ids),
@@ -118,13 +221,55 @@ class Main(object):
         print('')
         print('working on {} AT&T OpenOMCI MEs'.format(len(self.class_ids)))
         print('')
+        jobs = self.args.jobs
+        if (self.profiler is not None or self.args.rules is not None) and jobs > 1:
+            print('Profiling/counting, MEs will be parsed in this process instead of {} workers'.
+                  format(jobs))
+            jobs = 1
+
+        counters = None
+        if self.args.rules is not None:
+            counters = RuleCounters().install([contents], ClassId)
+
+        # Each ME is written to the output as soon as it is parsed so that the
+        # results can be used by a code-generation tool
         print('Parsing deeper for managed Entities with Sections')
-        for c in self.class_ids.values():
-            print('    {:>9}:  {:>4}: {} -> {}'.format(c.section.section_number,
-                                                       c.cid,
-                                                       c.name,
-                                                       camelcase(c.name)))
-            c.deep_parse(self.paragraphs)
+        print("Saving parsed MEs to '{}' ({})".format(self.args.output, self.args.format))
+        shards = None
+        if self.args.shards is not None:
+            print("Saving parsed MEs to shard directory '{}'".format(self.args.shards))
+            shards = ShardedMEWriter(self.args.shards).open()
+
+        complete = False
+        try:
+            with timing.stage('deep_parse_all'), \
+                    MEWriter(self.args.output, self.args.format) as output:
+                for c in ClassIdList.deep_parse_all(list(self.class_ids.values()),
+                                                    self.paragraphs,
+                                                    jobs=jobs,
+                                                    timing=timing,
+                                                    progress=Main.print_progress):
+                    self.class_ids[c.cid] = c
+                    with timing.stage('write'):
+                        record = c.as_dict()
+                        output.write_record(record)
+                        if shards is not None:
+                            shards.write_record(record)
+            complete = True
+        finally:
+            if shards is not None:
+                shards.close(complete=complete)
+                print('Saved {} ME shards, {} unchanged'.format(shards.count, shards.unchanged))
+
+            if counters is not None:
+                counters.uninstall()
+                print('')
+                print('Content classification rules, most expensive first:')
+                counters.dump()
+                print('Saving rule counts to {}'.format(self.args.rules))
+                counters.save(self.args.rules)
+
+        timing.count('managed_entities', len(self.class_ids))
 
         completed = len([c.state == 'complete' for c in self.class_ids.values()])
         failed = len([c.state == 'failure' for c in self.class_ids.values()])
@@ -134,92 +279,17 @@ class Main(object):
                                                                             failed))
         # Run some sanity checks
         print('\n\n\nValidating ME Class Information:\n')
-        for c in self.class_ids.values():
-            print('  Class ID: {} - {}'.format(c.cid, c.name))
-            if len(c.attributes) == 0:
-                print('    NO ATTRIBUTES')      # TODO Look for 'set' without 'get'
-
-            for attr in c.attributes:
-                if attr.access is None or len(attr.access) == 0:
-                    print('    NO ACCESS INFORMATION')
-                # if attr.size is None:
-                #     print('    NO SIZE INFORMATION')      TODO: Get Size decode working
-
-        # Output the results to a JSON file so it can be used by a code-generation
-        # tool
-
-        # TODO: Write it out here.
-
-
-att_openomci = {
-    2,
-    5,
-    6,
-    7,
-    11,
-    24,
-    45,
-    47,
-    53,
-    58,
-    84,
-    130,
-    131,
-    133,
-    134,
-    135,
-    136,
-    137,
-    138,
-    139,
-    142,
-    143,
-    148,
-    150,
-    151,
-    152,
-    153,
-    155,
-    156,
-    157,
-    158,
-    171,
-    256,
-    257,
-    262,
-    263,
-    264,
-    266,
-    268,
-    272,
-    273,
-    274,
-    277,
-    278,
-    280,
-    281,
-    287,
-    290,
-    299,
-    300,
-    302,
-    305,
-    309,
-    310,
-    312,
-    321,
-    322,
-    329,
-    332,
-    335,
-    336,
-    340,
-    341,
-    344,
-    345,
-    346,
-    349,
-}
+        with timing.stage('validation'):
+            for c in self.class_ids.values():
+                print('  Class ID: {} - {}'.format(c.cid, c.name))
+                if len(c.attributes) == 0:
+                    print('    NO ATTRIBUTES')      # TODO Look for 'set' without 'get'
+
+                for attr in c.attributes:
+                    if attr.access is None or len(attr.access) == 0:
+                        print('    NO ACCESS INFORMATION')
+                    # if attr.size is None:
+                    #     print('    NO SIZE INFORMATION')      TODO: Get Size decode working
 
 
 if __name__ == '__main__':
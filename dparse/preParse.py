@@ -15,14 +15,26 @@
 #
 #   This program will walk the ITU G.988 docx document and extract section
 #   headers (and following paragraphs) and any Table Items.  It then
-#   will save this to a pre-compiled JSON file that can then be used
-#   later to quickly load the sections for further processing
+#   will save this to a pre-compiled JSON (or binary) file that can then be used
+#   later to quickly load the sections for further processing.  The text,
+#   style and bold text of each paragraph within a section is saved as
+#   well so that the document does not need to be loaded again.
 
 from __future__ import (
     absolute_import, division, print_function, unicode_literals
 )
+import os
 import sys
+import copy
+import json
+import time
+import hashlib
 import argparse
+import threading
+import itertools
+import queue
+from concurrent.futures import ProcessPoolExecutor
+from lxml import etree
 from docx import Document
 from docx.document import Document as _Document
 from docx.oxml.text.paragraph import CT_P
@@ -31,11 +43,33 @@ from docx.table import _Cell
 from docx.table import Table as DocxTable
 from docx.text.paragraph import Paragraph
 
+from docxstream import StreamDocument, StreamParagraph, StreamRun, StreamTable
 from section import SectionHeading, SectionList
+from paragraphs import ParagraphRecord
+from styles import StyleTable, FAMILY_SECTION_HEADING
 from tables import Table
+from class_id import ClassIdList
+from profiles import PROFILES, profile_class_ids
+from timing import Timing
+from profiling import Profiler
 
+PARAGRAPH_TYPES = (Paragraph, StreamParagraph)
+TABLE_TYPES = (DocxTable, StreamTable)
 
-def parse_args():
+# Stages reported by --timing and that --profile-stage can select
+STAGES = ('docx_open', 'incremental_load', 'resume', 'heading_scan', 'class_id_section',
+          'block_walk', 'table_create', 'checkpoint', 'save', 'json_export', 'dump',
+          'verification_reload')
+
+# Deepest section headings (9.1, 9.2, ...) that --jobs prefers to split the body at
+SPLIT_DEPTH = 2
+
+
+def parse_args(argv=None):
+    """
+    :param argv: (list) Command line arguments, default: sys.argv[1:]
+    :return: (Namespace) Options, any not given in argv have their defaults
+    """
     parser = argparse.ArgumentParser(description='G.988 Pre-process Parser')
 
     parser.add_argument('--input', '-i', action='store',
@@ -46,84 +80,820 @@ def parse_args():
                         default='G.988.PreCompiled.json',
                         help='Output filename, default: G.988.PreCompiiled.json')
 
-    args = parser.parse_args()
-    return args.input, args.output
+    parser.add_argument('--stream', '-s', action='store_true',
+                        help='Stream the document body instead of loading it with python-docx')
+
+    parser.add_argument('--incremental', '-n', action='store', nargs='?', const='',
+                        default=None, metavar='PREVIOUS',
+                        help='Reuse the tables of sections that have not changed since a '
+                             'previous run, default: the output file')
+
+    parser.add_argument('--binary', '-b', action='store_true',
+                        help='Save to a binary container with sections loaded on first use '
+                             'instead of JSON')
+
+    parser.add_argument('--json', action='store', default=None, metavar='EXPORT',
+                        help='Also export the sections to this JSON file')
+
+    parser.add_argument('--checkpoint', action='store', type=float, default=60.0,
+                        metavar='SECONDS',
+                        help='Save a checkpoint of the sections parsed so far to '
+                             'OUTPUT.checkpoint at most this often, 0 disables, default: 60')
+
+    parser.add_argument('--resume', '-r', action='store_true',
+                        help='Continue from the checkpoint of an earlier run that did not '
+                             'complete instead of starting at the beginning of the document')
+
+    parser.add_argument('--jobs', '-j', action='store', type=int, default=1,
+                        help='Number of worker processes that parse ranges of the document '
+                             'body between section headings, default: 1')
+
+    parser.add_argument('--me-profile', action='store', default=None, metavar='PROFILE',
+                        help='Only extract the Class ID section and the sections of the MEs '
+                             'in this profile ({}) or comma separated list of class IDs, '
+                             'stopping once the last of them is done'.
+                        format(', '.join(sorted(PROFILES))))
+
+    parser.add_argument('--classes', '-c', action='store', default='11.2.4',
+                        help='Document section number with ME Class IDs, used with '
+                             '--me-profile, default: 11.2.4')
+
+    parser.add_argument('--pipeline', action='store', nargs='?', type=int, const=0,
+                        default=None, metavar='WORKERS',
+                        help='Read and decode the document body in a separate thread while '
+                             'sections are built, with tables built by WORKERS processes, '
+                             'default: 0 (tables are built as sections complete)')
+
+    parser.add_argument('--timing', '-t', action='store', nargs='?',
+                        const='preParse.timing.json', default=None, metavar='REPORT',
+                        help='Save stage timing and counts to a JSON report, '
+                             'default: preParse.timing.json')
+
+    parser.add_argument('--profile', '-p', action='store', nargs='?',
+                        const='preParse.profile', default=None, metavar='PREFIX',
+                        help='Profile the run and save PREFIX.pstats and PREFIX.collapsed '
+                             '(flame graph stacks), default: preParse.profile')
+
+    parser.add_argument('--profile-stage', action='append', default=None,
+                        choices=STAGES, metavar='STAGE',
+                        help='Only profile this stage (may be repeated): {}'.
+                        format(', '.join(STAGES)))
+
+    args = parser.parse_args(argv)
+
+    if args.me_profile is not None:
+        try:
+            profile_class_ids(args.me_profile)
+        except ValueError as e:
+            parser.error(str(e))
+
+    return args
+
+
+def is_section_header(p, style):
+    """
+    :param p: (Paragraph) Docx or stream paragraph
+    :param style: (ParagraphStyle) Its style, see StyleTable.style_of()
+    """
+    return (isinstance(p, PARAGRAPH_TYPES)
+            and len(p.text)
+            and style.family & FAMILY_SECTION_HEADING)
+
+
+def table_xml(block):
+    """ Serialized XML of a docx or stream table """
+    if isinstance(block, StreamTable):
+        return block.xml if block.element is None else etree.tostring(block.element)
+    return etree.tostring(block._tbl)
+
+
+def plain_block(block, styles):
+    """
+    A body block as a stream paragraph or detached stream table, which holds
+    no reference to the document XML
+
+    :param block: (Paragraph) or (Table), docx or stream
+    :param styles: (StyleTable) Styles of the document
+    """
+    if isinstance(block, StreamTable):
+        return block.detach()
+
+    if isinstance(block, DocxTable):
+        return StreamTable.create(block._tbl, styles).detach()
+
+    if isinstance(block, Paragraph):
+        paragraph = StreamParagraph([StreamRun(r.text, r.bold) for r in block.runs],
+                                    styles.style_of(block))
+        paragraph.text = block.text         # May hold more than its runs (hyperlinks, ...)
+        return paragraph
+
+    return block
+
+
+class BlockReader(object):
+    """
+    Reads the document body in a background thread.
+
+    The thread decodes each block with plain_block() and hands them, a batch
+    at a time, over a bounded queue so that unzipping and parsing the XML
+    overlaps with building the sections.
+    """
+    _END = object()
+
+    def __init__(self, blocks, styles, queue_size=16, batch_size=64):
+        self._blocks = blocks
+        self._styles = styles
+        self._batch_size = batch_size
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __iter__(self):
+        self._thread = threading.Thread(target=self._read, name='BlockReader')
+        self._thread.daemon = True
+        self._thread.start()
+
+        try:
+            while True:
+                batch = self._queue.get()
+                if batch is BlockReader._END:
+                    return
+                if isinstance(batch, BaseException):
+                    raise batch
+
+                for block in batch:
+                    yield block
+        finally:
+            self._stop.set()
+            self._thread.join()
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _read(self):
+        try:
+            batch = list()
+            for block in self._blocks:
+                batch.append(plain_block(block, self._styles))
+                if len(batch) >= self._batch_size:
+                    if not self._put(batch):
+                        return
+                    batch = list()
+
+            if batch and not self._put(batch):
+                return
+            self._put(BlockReader._END)
+
+        except Exception as e:
+            self._put(e)
+
+
+class SectionBuilder(object):
+    """
+    Builds the section list from the paragraphs and tables of the document
+    body as they are passed in, in document order.
+
+    A content hash covering the heading text, paragraph text and table XML
+    is kept for each section.  Tables are extracted once the section is
+    complete so that, if a previous run had a section with the same hash,
+    its tables can be reused instead.
+    """
+    def __init__(self, sections, styles, cache=None, timing=None):
+        self.sections = sections
+        self.styles = styles            # (StyleTable) Styles of the document
+        self.cache = cache              # Key -> content hash, Value -> list of (Table)
+        self.timing = timing if timing is not None else Timing('preParse', enabled=False)
+        self.bnum = 0                   # Document body block number
+        self.pnum = 0                   # Document paragraph number
+        self.tnum = 0                   # Document table number
+        self.checkpoint = None          # Called between sections, see Checkpoint
+        self.executor = None            # If set, tables are built in this pool, see resolve()
+        self.current_section = None
+        self.reused = 0                 # Sections with tables from the cache
+        self.extracted = 0              # Sections with tables extracted
+        self._hash = None
+        self._pending = list()          # (contents position, table number, table block)
+        self._futures = list()          # (section, contents position, future table)
+
+    def add_block(self, block):
+        if isinstance(block, PARAGRAPH_TYPES):
+            style = self.styles.style_of(block)
+
+            if is_section_header(block, style):
+                # Save of previous
+                self.finish()
+                if self.checkpoint is not None:
+                    self.checkpoint(self)
+
+                self.current_section = SectionHeading.create(self.pnum, block, style)
+                self.sections.add(self.current_section)
+                self._hash = hashlib.sha1(block.text.encode('utf-8'))
+
+            elif len(block.text) > 0 and self.current_section is not None:
+                self.current_section.add_contents(self.pnum)
+                self.sections.paragraphs.add(self.pnum, ParagraphRecord.create(block, style))
+                self._hash.update(b'\x00P' + block.text.encode('utf-8'))
+
+            self.pnum += 1
+
+        elif isinstance(block, TABLE_TYPES):
+            if self.current_section is not None:
+                self._hash.update(b'\x00T' + table_xml(block))
+                self._pending.append((len(self.current_section.contents), self.tnum, block))
+                self.current_section.add_contents(None)     # Filled in by finish()
+            self.tnum += 1
+
+        else:
+            print('Unsupported block type: {}'.format(type(block)))
+
+        self.bnum += 1
+
+    def finish(self):
+        """ Complete the current section """
+        section = self.current_section
+        if section is None:
+            return
+
+        section.content_hash = self._hash.hexdigest()
+        cached = self.cache.get(section.content_hash) if self.cache is not None else None
+
+        if cached is not None and len(cached) == len(self._pending):
+            for (position, tnum, _block), cached_table in zip(self._pending, cached):
+                table = copy.copy(cached_table)
+                table.doc_table_number = tnum
+                section.contents[position] = table
+            self.reused += 1
+
+        elif self.executor is not None:
+            for position, tnum, block in self._pending:
+                self._futures.append((section, position,
+                                      self.executor.submit(Table.create, tnum, block)))
+            self.extracted += 1
+
+        else:
+            for position, tnum, block in self._pending:
+                with self.timing.stage('table_create'):
+                    section.contents[position] = Table.create(tnum, block, self.styles)
+            self.extracted += 1
+
+        self.current_section = None
+        self._pending = list()
+
+    def resolve(self):
+        """ Wait for the tables being built by the executor and place them in their sections """
+        for section, position, future in self._futures:
+            with self.timing.stage('table_create'):
+                table = future.result()
+            table.heading = table.heading           # Intern again after the process hop
+            section.contents[position] = table
+
+        self._futures = list()
+
+    @staticmethod
+    def load_cache(filepath):
+        """ Tables of each section from a previous run, keyed by content hash """
+        previous = SectionList()
+        previous.load(filepath)
+
+        return {section.content_hash: section.tables for section in previous
+                if section.content_hash is not None}
+
+
+class Checkpoint(object):
+    """
+    Snapshot of a SectionBuilder that a later run can resume from.
+
+    It is taken between sections, when all tables of the completed sections
+    have been extracted, and holds the block, paragraph and table numbers, the
+    section counters and the sections parsed so far.  A hash of the source
+    document is saved too so that a checkpoint is not resumed against a
+    different document.
+    """
+    VERSION = 1
+
+    def __init__(self, filepath, source_file, interval=60.0, timing=None):
+        self.filepath = filepath
+        self.interval = interval        # Seconds between checkpoints, 0 disables
+        self.timing = timing if timing is not None else Timing('preParse', enabled=False)
+        self.saved = 0
+        self._source_file = source_file
+        self._source = None             # Hash of the source, only worked out if needed
+        self._last = time.time()
+
+    def __call__(self, builder):
+        if 0 < self.interval <= time.time() - self._last:
+            self.save(builder)
+
+    @property
+    def source(self):
+        """ (str) Hash of the source document, read on first use """
+        if self._source is None:
+            self._source = Checkpoint.source_hash(self._source_file)
+        return self._source
+
+    @staticmethod
+    def source_hash(source_file):
+        sha = hashlib.sha1()
+        with open(source_file, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    def save(self, builder):
+        with self.timing.stage('checkpoint'):
+            builder.resolve()
+            data = json.dumps({
+                'version': Checkpoint.VERSION,
+                'source': self.source,
+                'block': builder.bnum,
+                'paragraph': builder.pnum,
+                'table': builder.tnum,
+                'reused': builder.reused,
+                'extracted': builder.extracted,
+                'sections': builder.sections.as_dict(),
+            }, separators=(',', ':'))
+
+            # Replace the previous checkpoint only once this one is complete
+            temp_file = self.filepath + '.tmp'
+            with open(temp_file, 'w') as f:
+                f.write(data)
+            os.replace(temp_file, self.filepath)
+
+        self.saved += 1
+        self._last = time.time()
+
+    def restore(self, builder):
+        """
+        Restore a builder from the checkpoint file
+
+        :param builder: (SectionBuilder) New builder, with an empty section list
+        :return: (int) Number of body blocks to skip, None if there is no usable checkpoint
+        """
+        if not os.path.exists(self.filepath):
+            print('No checkpoint {} found, starting at the beginning'.format(self.filepath))
+            return None
+
+        with open(self.filepath, 'r') as f:
+            data = json.load(f)
+
+        if data.get('version') != Checkpoint.VERSION or data.get('source') != self.source:
+            print('Checkpoint {} is not for this document, starting at the beginning'.
+                  format(self.filepath))
+            return None
+
+        builder.sections.load_dict(data['sections'])
+        builder.bnum = data['block']
+        builder.pnum = data['paragraph']
+        builder.tnum = data['table']
+        builder.reused = data['reused']
+        builder.extracted = data['extracted']
+        return builder.bnum
+
+    def remove(self):
+        if os.path.exists(self.filepath):
+            os.remove(self.filepath)
+
+
+def scan_headings(document):
+    """
+    Section headings of the document body, from a quick pass over its XML
+
+    :param document: (StreamDocument) Document
+    :return: (list, tuple) (block, paragraph, table, SectionHeading) of each section
+             heading, and the (block, paragraph, table) counts of the whole body
+    """
+    headings = list()
+    for bnum, pnum, tnum, paragraph in document.iter_headings(FAMILY_SECTION_HEADING):
+        if paragraph is None:
+            return headings, (bnum, pnum, tnum)
+        headings.append((bnum, pnum, tnum, SectionHeading.create(pnum, paragraph)))
+
+
+def split_ranges(headings, end, chunks):
+    """
+    Split the document body into ranges of blocks that start at a section
+    heading, so that each can be parsed on its own.
+
+    Only headings down to SPLIT_DEPTH are used unless there are too few of
+    them, and a range is closed at the first such heading once it holds its
+    share of the blocks.
+
+    :param headings: (list) (block, paragraph, table, depth) of each section heading
+    :param end: (tuple) (block, paragraph, table) counts of the whole body
+    :param chunks: (int) Number of ranges wanted
+    :return: (list) (start block, stop block, first paragraph number, first table number)
+    """
+    candidates = [h for h in headings if h[3] <= SPLIT_DEPTH]
+    if len(candidates) < chunks:
+        candidates = headings
+
+    share = end[0] / max(chunks, 1)
+    starts = [(0, 0, 0)]
+    for bnum, pnum, tnum, _depth in candidates:
+        if bnum - starts[-1][0] >= share:
+            starts.append((bnum, pnum, tnum))
+
+    stops = [start[0] for start in starts[1:]] + [end[0]]
+    return [(start, stop, pnum, tnum) for (start, pnum, tnum), stop in zip(starts, stops)]
+
+
+def _walk_worker(work):
+    """
+    Worker process side of Main.parallel_walk(): build the sections of one
+    range of body blocks, numbering paragraphs and tables from its offsets
+
+    :return: (tuple) Sections as SectionList.as_dict(), the paragraph and table
+             numbers at the end of the range, sections reused and extracted and
+             the worker's stage times for Timing.merge()
+    """
+    source_file, stream, start, stop, pnum, tnum, cache, timed = work
+    timing = Timing('preParse', enabled=timed)
+
+    with timing.stage('docx_open'):
+        if stream:
+            document = StreamDocument(source_file).open()
+            blocks = document.iter_block_items(start, stop)
+            styles = StyleTable()
+        else:
+            document = Document(source_file)
+            blocks = itertools.islice(Main.iter_block_items(document), start, stop)
+            styles = StyleTable.create(document.styles)
+
+    sections = SectionList()
+    builder = SectionBuilder(sections, styles, cache=cache, timing=timing)
+    builder.bnum, builder.pnum, builder.tnum = start, pnum, tnum
+
+    for block in blocks:
+        builder.add_block(block)
+    builder.finish()
+
+    if stream:
+        document.close()
+
+    return sections.as_dict(), builder.pnum, builder.tnum, builder.reused, builder.extracted, \
+        {name: stage.as_dict() for name, stage in timing.stages.items()}
 
 
 class Main(object):
     """ Main program """
-    def __init__(self):
-        self.args = parse_args()
+    def __init__(self, args=None):
+        self.args = args if args is not None else parse_args()
 
     def start(self, source_file, output):
+        profiler = None
+        if self.args.profile is not None or self.args.profile_stage:
+            profiler = Profiler(self.args.profile or 'preParse.profile',
+                                stages=self.args.profile_stage)
+
+        timing = Timing('preParse', enabled=self.args.timing is not None, profiler=profiler)
+        try:
+            if profiler is not None:
+                profiler.start()
+            self._start(source_file, output, timing)
+
+        finally:
+            if profiler is not None:
+                profiler.stop()
+                for filepath in profiler.save():
+                    print('Saved profile to {}'.format(filepath))
+
+            if timing.enabled:
+                print('Saving timing report to {}'.format(self.args.timing))
+                timing.save(self.args.timing)
+
+    def _start(self, source_file, output, timing):
         sections = SectionList()
-        document = Document(source_file)
-
-        paragraphs = document.paragraphs
-        doc_sections = document.sections
-        styles = document.styles
-        tables = document.tables
-
-        print('Number of sections  : {}'.format(len(doc_sections)))
-        print('Number of paragraphs: {}'.format(len(paragraphs)))
-        print('Number of styles    : {}, {} are built-in styles'.format(len(styles),
-                                                                        len([x for x in styles
-                                                                             if x.builtin])))
-        print('Number of tables    : {}'.format(len(tables)))
-        print('Parsing paragraphs & tables to extract high level information.')
-        print('This will take a little while (4-5 minutes)')
-
-        pnum = 0
-        tnum = 0
-        current_section = None
-
-        def is_section_header(p):
-            return (isinstance(p, Paragraph)
-                    and len(p.text)
-                    and p.style.builtin
-                    and 'heading ' in p.style.name.lower())
-
-        for block in Main.iter_block_items(document):
-            if isinstance(block, Paragraph):
-                if is_section_header(block):
-                    # Save of previous
-                    current_section = SectionHeading.create(pnum, block)
-                    sections.add(current_section)
-
-                elif len(block.text) > 0 and current_section is not None:
-                    current_section.add_contents(pnum)
-
-                pnum += 1
-
-            elif isinstance(block, DocxTable):
-                if current_section is not None:
-                    table = Table.create(tnum, block)
-                    current_section.add_contents(table)
-                tnum += 1
+        jobs = self.args.jobs
+        if self.args.me_profile is not None and jobs > 1:
+            print('--jobs is not used with --me-profile')
+            jobs = 1
 
+        if self.args.stream or jobs > 1:
+            with timing.stage('docx_open'):
+                document = StreamDocument(source_file).open()
+                blocks = document.iter_block_items()
+                styles = StyleTable()            # Stream paragraph styles are resolved as read
+
+            if jobs > 1:
+                print('Parsing paragraphs & tables with {} worker processes{}.'.
+                      format(jobs, ' (streaming)' if self.args.stream else ''))
             else:
-                print('Unsupported block type: {}'.format(type(block)))
+                print('Streaming paragraphs & tables to extract high level information.')
 
-            if pnum % 25 == 24:
-                print('.', end='')
-                sys.stdout.flush()
-            if pnum % 2000 == 1999:
-                print('')
+        else:
+            with timing.stage('docx_open'):
+                document = Document(source_file)
+                blocks = Main.iter_block_items(document)
+                styles = StyleTable.create(document.styles)
+
+            paragraphs = document.paragraphs
+            doc_sections = document.sections
+            tables = document.tables
+
+            print('Number of sections  : {}'.format(len(doc_sections)))
+            print('Number of paragraphs: {}'.format(len(paragraphs)))
+            print('Number of styles    : {}, {} are built-in styles'.
+                  format(len(document.styles), len([x for x in document.styles if x.builtin])))
+            print('Number of tables    : {}'.format(len(tables)))
+            print('Parsing paragraphs & tables to extract high level information.')
+            print('This will take a little while (4-5 minutes)')
+
+        cache = None
+        if self.args.incremental is not None:
+            previous = self.args.incremental or output
+            if os.path.exists(previous):
+                print('Reusing unchanged sections from {}'.format(previous))
+                with timing.stage('incremental_load'):
+                    cache = SectionBuilder.load_cache(previous)
+            else:
+                print('Previous pre-parse {} not found, extracting all sections'.format(previous))
+
+        if self.args.me_profile is not None:
+            checkpoint = None
+            if self.args.resume or self.args.pipeline is not None:
+                print('Checkpoints and --pipeline are not used with --me-profile')
+
+            builder = self.targeted_walk(document, source_file, sections, styles, cache, timing)
+
+        elif jobs > 1:
+            checkpoint = None
+            if self.args.resume:
+                print('Checkpoints are not used with --jobs, parsing the whole document')
+            if self.args.pipeline is not None:
+                print('--pipeline is not used with --jobs')
+
+            builder = self.parallel_walk(document, source_file, sections, cache, timing)
+
+        else:
+            builder = SectionBuilder(sections, styles, cache=cache, timing=timing)
+            checkpoint = Checkpoint(output + '.checkpoint', source_file,
+                                    interval=self.args.checkpoint, timing=timing)
+
+            if self.args.resume:
+                with timing.stage('resume'):
+                    skip = checkpoint.restore(builder)
+
+                if skip is not None:
+                    print('Resuming at paragraph {}, table {} with {} sections from {}'.
+                          format(builder.pnum, builder.tnum, len(sections), checkpoint.filepath))
+                    if isinstance(document, StreamDocument):
+                        # Replaces the unstarted generator, skipped blocks are not decoded
+                        blocks = document.iter_block_items(start=skip)
+                    else:
+                        blocks = itertools.islice(blocks, skip, None)
+
+            if checkpoint.interval > 0:
+                builder.checkpoint = checkpoint
+
+            executor = None
+            if self.args.pipeline is not None:
+                print('Reading the document body in a separate thread{}'.
+                      format(', building tables in {} processes'.format(self.args.pipeline)
+                             if self.args.pipeline > 0 else ''))
+                blocks = BlockReader(blocks, styles)
+
+                if self.args.pipeline > 0:
+                    executor = ProcessPoolExecutor(max_workers=self.args.pipeline)
+                    builder.executor = executor
+
+            try:
+                with timing.stage('block_walk'):
+                    for block in blocks:
+                        builder.add_block(block)
+
+                        pnum = builder.pnum
+                        if pnum % 25 == 24:
+                            print('.', end='')
+                            sys.stdout.flush()
+                        if pnum % 2000 == 1999:
+                            print('')
+
+                    builder.finish()
+                    builder.resolve()
+            finally:
+                if executor is not None:
+                    executor.shutdown()
+
+        if isinstance(document, StreamDocument):
+            document.close()
+
+        timing.count('paragraphs', builder.pnum)
+        timing.count('tables', builder.tnum)
+        timing.count('sections', len(sections))
+        timing.count('section_paragraphs', len(sections.paragraphs))
 
-        # Save to file
         print('')
+        if self.args.stream or jobs > 1:
+            print('Number of paragraphs: {}'.format(builder.pnum))
+            print('Number of paragraph styles: {}, {} are built-in styles'.
+                  format(len(document.styles), len([x for x in document.styles if x.builtin])))
+            print('Number of tables    : {}'.format(builder.tnum))
+
+        if cache is not None:
+            print('Sections reused: {}, re-extracted: {}'.format(builder.reused,
+                                                                builder.extracted))
+            timing.count('sections_reused', builder.reused)
+            timing.count('sections_extracted', builder.extracted)
+
+        # Save to file
         print('Saving Section parsing information to {}'.format(output))
-        sections.save(output)
+        with timing.stage('save'):
+            if self.args.binary:
+                sections.save_binary(output)
+            else:
+                sections.save(output)
+
+        if self.args.json is not None:
+            print('Exporting Section parsing information to {}'.format(self.args.json))
+            with timing.stage('json_export'):
+                sections.save(self.args.json)
+
+        if checkpoint is not None:
+            timing.count('checkpoints', checkpoint.saved)
+            checkpoint.remove()
 
         print('Section pre-parsing are complete')
-        sections.dump()
+        with timing.stage('dump'):
+            sections.dump()
 
         # Restore and verify
-        sections.load(output)
+        with timing.stage('verification_reload'):
+            sections.load(output)
+
+            print('Dumping data loaded from saved file for verification')
+            for section in sections:
+                print('  Section: {} -> {}'.format(section, section.section_points))
+
+    def parallel_walk(self, document, source_file, sections, cache, timing):
+        """
+        Parse the document body in worker processes. The body is first scanned
+        for the section headings, with the paragraph and table numbers at each,
+        and then split into ranges between headings that are parsed in parallel
+        and merged in document order.
+
+        :return: (SectionBuilder) Holding the totals of the whole body
+        """
+        jobs = self.args.jobs
+
+        with timing.stage('heading_scan'):
+            scanned, end = scan_headings(document)
+            headings = [(bnum, pnum, tnum, len(heading.section_points))
+                        for bnum, pnum, tnum, heading in scanned]
+
+        # Each range opens the document and skips to its start, so one per worker
+        ranges = split_ranges(headings, end, jobs)
+        print('Found {} section headings, parsing the body in {} ranges'.
+              format(len(headings), len(ranges)))
+
+        builder = SectionBuilder(sections, StyleTable(), timing=timing)
+        # There is one range per worker, so the incremental cache is sent to each
+        # worker once, as a pool initializer (Python 3.7) would
+        work = [(source_file, self.args.stream, start, stop, pnum, tnum, cache, timing.enabled)
+                for start, stop, pnum, tnum in ranges]
+
+        with timing.stage('block_walk'), ProcessPoolExecutor(max_workers=jobs) as executor:
+            for (start, stop, pnum, tnum), result in zip(ranges,
+                                                         executor.map(_walk_worker, work)):
+                data, end_pnum, end_tnum, reused, extracted, stages = result
+                timing.merge(stages)
+                assert pnum == builder.pnum and tnum == builder.tnum, \
+                    'Range at block {} does not follow on from the previous one'.format(start)
+
+                part = SectionList()
+                part.load_dict(data)
+                for section in part:
+                    sections.add(section)
+                for number, record in part.paragraphs.items():
+                    sections.paragraphs.add(number, record)
+
+                builder.bnum, builder.pnum, builder.tnum = stop, end_pnum, end_tnum
+                builder.reused += reused
+                builder.extracted += extracted
+                print('.', end='')
+                sys.stdout.flush()
+
+        assert (builder.bnum, builder.pnum, builder.tnum) == end, \
+            'Ranges do not cover the document body'
+        return builder
+
+    def targeted_walk(self, document, source_file, sections, styles, cache, timing):
+        """
+        Parse only the Class ID section and the sections of the MEs in the
+        --me-profile.
+
+        The section headings are scanned first.  The Class ID section, which
+        follows the ME sections in the document, is parsed next so that the
+        class IDs can be matched to their sections by name, as the final
+        parser does.  Only the ranges of those sections are then read and the
+        walk ends once the last of them is done.
+
+        :return: (SectionBuilder) Holding the totals of the whole body
+        """
+        wanted = profile_class_ids(self.args.me_profile)
+        scanner = document if isinstance(document, StreamDocument) else \
+            StreamDocument(source_file)
+
+        with timing.stage('heading_scan'):
+            scanned, end = scan_headings(scanner)
+
+        skeleton = SectionList()
+        positions = dict()
+        for position, (_bnum, _pnum, _tnum, heading) in enumerate(scanned):
+            skeleton.add(heading)
+            positions[id(heading)] = position
+
+        def section_range(heading):
+            position = positions[id(heading)]
+            start, pnum, tnum, _heading = scanned[position]
+            stop = scanned[position + 1][0] if position + 1 < len(scanned) else end[0]
+            return start, stop, pnum, tnum
+
+        try:
+            class_id_heading = skeleton.find_section(self.args.classes)
+        except KeyError:
+            sys.exit("preParse.py: error: Class ID section '{}' (--classes) not found in {}".
+                     format(self.args.classes, source_file))
+
+        with timing.stage('class_id_section'):
+            class_id_range = section_range(class_id_heading)
+            class_id_builder = SectionBuilder(SectionList(), styles, cache=cache, timing=timing)
+            self.walk_ranges(document, [class_id_range], class_id_builder)
+            class_ids = ClassIdList.parse_sections(class_id_builder.sections, self.args.classes)
+
+        ranges = set()
+        missing = list()
+        for cid in sorted(wanted):
+            heading = skeleton.find_section_by_name(class_ids[cid].name) \
+                if class_ids.has_key(cid) else None
+            if heading is None:
+                missing.append(cid)
+            else:
+                ranges.add(section_range(heading))
+
+        ranges = sorted(ranges)
+        print('Profile {}: {} of {} MEs have sections, extracting {} of {} sections'.
+              format(self.args.me_profile, len(wanted) - len(missing), len(wanted),
+                     len(ranges) + 1, len(scanned)))
+        if missing:
+            print('    Class IDs without sections: {}'.format(missing))
+        if ranges:
+            print('    The last ME section ends at body block {} of {}'.format(ranges[-1][1],
+                                                                           end[0]))
+
+        builder = SectionBuilder(SectionList(), styles, cache=cache, timing=timing)
+        with timing.stage('block_walk'):
+            self.walk_ranges(document, ranges, builder)
+
+        # Merge with the Class ID section in document order. Each range holds one section
+        parts = list(zip([start for start, _stop, _pnum, _tnum in ranges], builder.sections))
+        parts.append((class_id_range[0], class_id_builder.sections[0]))
+        for _start, section in sorted(parts, key=lambda part: part[0]):
+            sections.add(section)
+
+        for part in (builder.sections, class_id_builder.sections):
+            for number, record in part.paragraphs.items():
+                sections.paragraphs.add(number, record)
+
+        builder.sections = sections
+        builder.bnum, builder.pnum, builder.tnum = end
+        builder.reused += class_id_builder.reused
+        builder.extracted += class_id_builder.extracted
+        return builder
+
+    @staticmethod
+    def walk_ranges(document, ranges, builder):
+        """
+        Add the blocks of some ranges of the document body to a builder, numbering
+        the paragraphs and tables of each range from its offsets
+
+        :param document: (StreamDocument) or python-docx (Document)
+        :param ranges: (list) (start block, stop block, first paragraph number,
+                       first table number) of each range, in document order
+        """
+        stream = isinstance(document, StreamDocument)
+        if stream:
+            # Blocks outside of the ranges are not decoded
+            blocks = document.iter_block_ranges([(start, stop) for start, stop, _p, _t in ranges])
+        else:
+            blocks = Main.iter_block_items(document)
+
+        position = 0
+        for start, stop, pnum, tnum in ranges:
+            builder.finish()
+            builder.bnum, builder.pnum, builder.tnum = start, pnum, tnum
+
+            skip = 0 if stream else start - position
+            for block in itertools.islice(blocks, skip, skip + stop - start):
+                builder.add_block(block)
+            position = stop
 
-        print('Dumping data loaded from saved file for verification')
-        for section in sections:
-            print('  Section: {} -> {}'.format(section, section.section_points))
+        builder.finish()
 
     @staticmethod
     def iter_block_items(parent):
@@ -150,8 +920,8 @@ class Main(object):
 
 if __name__ == '__main__':
     try:
-        inputfile, output = parse_args()
-        Main().start(inputfile, output)
+        args = parse_args()
+        Main(args).start(args.input, args.output)
 
     except Exception as _e:
         raise
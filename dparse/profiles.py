@@ -0,0 +1,113 @@
+#
+# Copyright (c) 2018 - present.  Boling Consulting Solutions (bcsw.net)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+#   ME profiles: the sets of ME class IDs that a build works on.
+#
+from __future__ import (
+    absolute_import, division, print_function, unicode_literals
+)
+
+# AT&T OpenOMCI v3.0
+att_openomci = {
+    2,
+    5,
+    6,
+    7,
+    11,
+    24,
+    45,
+    47,
+    53,
+    58,
+    84,
+    130,
+    131,
+    133,
+    134,
+    135,
+    136,
+    137,
+    138,
+    139,
+    142,
+    143,
+    148,
+    150,
+    151,
+    152,
+    153,
+    155,
+    156,
+    157,
+    158,
+    171,
+    256,
+    257,
+    262,
+    263,
+    264,
+    266,
+    268,
+    272,
+    273,
+    274,
+    277,
+    278,
+    280,
+    281,
+    287,
+    290,
+    299,
+    300,
+    302,
+    305,
+    309,
+    310,
+    312,
+    321,
+    322,
+    329,
+    332,
+    335,
+    336,
+    340,
+    341,
+    344,
+    345,
+    346,
+    349,
+}
+
+
+PROFILES = {
+    'att_openomci': att_openomci,
+}
+
+
+def profile_class_ids(profile):
+    """
+    Class IDs of an ME profile
+
+    :param profile: (str) Profile name (see PROFILES) or a comma separated list
+                    of class IDs
+    :return: (set) Class IDs
+    """
+    if profile in PROFILES:
+        return set(PROFILES[profile])
+
+    try:
+        return {int(cid) for cid in profile.split(',') if cid.strip()}
+
+    except ValueError:
+        raise ValueError("Unknown ME profile '{}', expected one of {} or a comma separated "
+                         "list of class IDs".format(profile, ', '.join(sorted(PROFILES))))
@@ -0,0 +1,154 @@
+#
+# Copyright (c) 2018 - present.  Boling Consulting Solutions (bcsw.net)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from __future__ import (
+    absolute_import, division, print_function, unicode_literals
+)
+import os
+import pstats
+import cProfile
+from collections import defaultdict
+
+MAX_STACK_DEPTH = 200
+MIN_STACK_TIME = 1e-6           # Seconds, shorter stack entries are dropped
+
+
+def function_label(func):
+    """ Flame graph frame name for a pstats (file, line, function) key """
+    filename, line, name = func
+    if filename == '~':
+        return name.replace(';', ',')           # Built-in
+    return '{}:{}:{}'.format(os.path.basename(filename), line, name).replace(';', ',')
+
+
+def collapsed_stacks(stats):
+    """
+    Collapsed stack lines ('outer;inner;leaf microseconds') for flame graph
+    tools, from the call graph of a profile.
+
+    cProfile only records caller -> callee pairs, so the time of a function
+    that is called from several places is split across the stacks that lead
+    to it in proportion to the time spent under each caller.
+
+    :param stats: (pstats.Stats) Profile statistics
+    :return: (list) Collapsed stack lines
+    """
+    entries = stats.stats       # Key -> func, Value -> (cc, nc, tt, ct, callers)
+    callees = defaultdict(dict)
+
+    for func, (_cc, _nc, _tt, _ct, callers) in entries.items():
+        for caller, edge in callers.items():
+            callees[caller][func] = edge[3]     # Cumulative time under this caller
+
+    totals = defaultdict(float)
+
+    def walk(func, stack, on_stack, share):
+        _cc, _nc, tt, ct, _callers = entries[func]
+        stack = stack + [function_label(func)]
+
+        if tt * share >= MIN_STACK_TIME:
+            totals[';'.join(stack)] += tt * share
+
+        if len(stack) >= MAX_STACK_DEPTH:
+            return
+
+        on_stack.add(func)
+        for callee, edge_ct in callees.get(func, {}).items():
+            callee_ct = entries[callee][3]
+            if callee in on_stack or callee_ct <= 0:
+                continue        # Recursion is folded into the outer call
+
+            callee_share = share * edge_ct / callee_ct
+            if callee_ct * callee_share >= MIN_STACK_TIME:
+                walk(callee, stack, on_stack, callee_share)
+        on_stack.discard(func)
+
+    for func, entry in entries.items():
+        if not entry[4]:
+            walk(func, list(), set(), 1.0)      # Not called by anything profiled
+
+    return ['{} {}'.format(stack, int(round(seconds * 1e6)))
+            for stack, seconds in sorted(totals.items())
+            if int(round(seconds * 1e6)) > 0]
+
+
+class Profiler(object):
+    """
+    cProfile capture of a run, of some of its stages or of the deep parse
+    of some MEs.
+
+    The code being profiled marks its scopes with enter(scope)/exit(scope),
+    where a scope is a stage name (str) or an ME class ID (int). If no stages
+    or class IDs are given the whole run, from start() to stop(), is profiled.
+    """
+    def __init__(self, prefix, stages=None, class_ids=None):
+        self.prefix = prefix
+        self.stages = set(stages or ())
+        self.class_ids = set(class_ids or ())
+        self.profile = cProfile.Profile()
+        self._depth = 0
+
+    @property
+    def whole_run(self):
+        return not self.stages and not self.class_ids
+
+    def _enable(self):
+        if self._depth == 0:
+            self.profile.enable()
+        self._depth += 1
+
+    def _disable(self):
+        self._depth -= 1
+        if self._depth == 0:
+            self.profile.disable()
+
+    def start(self):
+        if self.whole_run:
+            self._enable()
+
+    def stop(self):
+        if self.whole_run and self._depth:
+            self._disable()
+
+    def _in_scope(self, scope):
+        return scope in (self.class_ids if isinstance(scope, int) else self.stages)
+
+    def enter(self, scope):
+        if self._in_scope(scope):
+            self._enable()
+
+    def exit(self, scope):
+        if self._in_scope(scope) and self._depth:
+            self._disable()
+
+    def save(self):
+        """
+        Save the profile as pstats (PREFIX.pstats) and collapsed stacks
+        (PREFIX.collapsed)
+
+        :return: (list) Files written, none if nothing was profiled
+        """
+        try:
+            stats = pstats.Stats(self.profile)
+        except TypeError:
+            return list()           # Nothing was profiled
+
+        stats_file = self.prefix + '.pstats'
+        stacks_file = self.prefix + '.collapsed'
+
+        stats.dump_stats(stats_file)
+        with open(stacks_file, 'w') as f:
+            for line in collapsed_stacks(stats):
+                f.write(line + '\n')
+
+        return [stats_file, stacks_file]
@@ -0,0 +1,226 @@
+#
+# Copyright (c) 2018 - present.  Boling Consulting Solutions (bcsw.net)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from __future__ import (
+    absolute_import, division, print_function, unicode_literals
+)
+import json
+import time
+import functools
+from collections import OrderedDict
+
+
+class RuleStats(object):
+    """ Call count, hit count and cumulative time of a rule """
+    def __init__(self):
+        self.calls = 0
+        self.hits = 0
+        self.seconds = 0.0
+
+    def add(self, hit, seconds):
+        self.calls += 1
+        self.hits += 1 if hit else 0
+        self.seconds += seconds
+
+    def as_dict(self):
+        return OrderedDict([
+            ('calls', self.calls),
+            ('hits', self.hits),
+            ('seconds', self.seconds),
+        ])
+
+
+_PREDICATES = 0                 # Index of the per-ME predicate counts
+_TRANSITIONS = 1                # Index of the per-ME transition counts
+_DISPATCH = 2                   # Index of the per-ME dispatch counts
+
+
+class RuleCounters(object):
+    """
+    Opt-in counters for the content classification rules used while deep
+    parsing MEs.
+
+    install() wraps each 'is_*' predicate in the given module namespaces
+    (contents.py, where the '*_parser' functions look them up) and sets itself
+    as the observer of the ClassId state table.  For every predicate the
+    number of calls, calls returning True (hits) and cumulative time are kept,
+    and for every (state, trigger) transition the number of times it fired,
+    the times it changed state (hits) and the time of its 'on_enter' callback.
+
+    The ClassId content dispatch table (see classify.py) stays enabled, so the
+    predicates are only counted when a parser actually runs them.  For every
+    (parser, category) pair looked up, the number of lookups, lookups answered
+    from the table (hits) and their time are kept.  A pair with few hits is
+    one whose predicates are still run, for instance items without a category.
+
+    Counts are kept in aggregate and for each ME.  uninstall() puts the
+    original functions back.  Only the current process is instrumented, so MEs
+    must be deep parsed in this process (no worker processes) while counting.
+    """
+    def __init__(self):
+        self.predicates = dict()        # Key -> (str) name, Value -> (RuleStats)
+        self.transitions = dict()       # Key -> (source, trigger, dest), Value -> (RuleStats)
+        self.dispatch = dict()          # Key -> (parser, category), Value -> (RuleStats)
+        self.managed_entities = OrderedDict()   # Key -> cid, Value -> (predicates, transitions,
+                                                #                       dispatch)
+        self._current = None            # (predicates, transitions, dispatch) of the ME being parsed
+        self._originals = list()        # (owner, name, original) for uninstall()
+        self._state_table = None
+
+    def install(self, namespaces, class_type):
+        """
+        :param namespaces: (list) Modules whose 'is_*' functions are counted
+        :param class_type: (ClassId) ME class, its deep_parse and state table are hooked
+        """
+        for module in namespaces:
+            for name in sorted(vars(module)):
+                func = getattr(module, name)
+                if name.startswith('is_') and callable(func):
+                    self._replace(module, name, self._wrap_predicate(name, func))
+
+        self._replace(class_type, 'deep_parse',
+                      self._wrap_deep_parse(class_type.__dict__['deep_parse']))
+
+        self._state_table = class_type.STATE_TABLE
+        self._state_table.observer = self.transition
+
+        dispatch = getattr(class_type, 'DISPATCH', None)
+        if dispatch is not None:
+            self._replace(dispatch, 'parse', self._wrap_dispatch(dispatch))
+        return self
+
+    def uninstall(self):
+        for owner, name, original in reversed(self._originals):
+            setattr(owner, name, original)
+        self._originals = list()
+
+        if self._state_table is not None:
+            self._state_table.observer = None
+            self._state_table = None
+
+    def _replace(self, owner, name, replacement):
+        self._originals.append((owner, name, getattr(owner, name)))
+        setattr(owner, name, replacement)
+
+    def _wrap_predicate(self, name, func):
+        @functools.wraps(func)
+        def predicate(*args, **kwargs):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            self._record(_PREDICATES, self.predicates, name, result, time.perf_counter() - start)
+            return result
+        return predicate
+
+    def _wrap_dispatch(self, dispatch):
+        parse = dispatch.parse
+
+        @functools.wraps(parse)
+        def wrapper(parser, content, paragraphs):
+            category = dispatch.category(content, paragraphs)
+            hit = category is not None and dispatch.has_entry(parser, category)
+
+            start = time.perf_counter()
+            result = parse(parser, content, paragraphs)
+            key = (parser.__name__, RuleCounters.category_name(category))
+            self._record(_DISPATCH, self.dispatch, key, hit, time.perf_counter() - start)
+            return result
+        return wrapper
+
+    @staticmethod
+    def category_name(category):
+        return '0x{:09x}'.format(category) if category is not None else 'unclassified'
+
+    def _wrap_deep_parse(self, deep_parse):
+        @functools.wraps(deep_parse)
+        def wrapper(class_id, *args, **kwargs):
+            self._current = self.managed_entities.setdefault(class_id.cid,
+                                                             (dict(), dict(), dict()))
+            try:
+                return deep_parse(class_id, *args, **kwargs)
+            finally:
+                self._current = None
+        return wrapper
+
+    def transition(self, _model, source, trigger, dest, seconds):
+        """ State table observer """
+        self._record(_TRANSITIONS, self.transitions, (source, trigger, dest), source != dest, seconds)
+
+    def _record(self, kind, aggregate, key, hit, seconds):
+        for table in (aggregate, self._current[kind] if self._current is not None else None):
+            if table is not None:
+                stats = table.get(key)
+                if stats is None:
+                    stats = RuleStats()
+                    table[key] = stats
+                stats.add(hit, seconds)
+
+    @staticmethod
+    def _predicates_list(predicates):
+        return [OrderedDict([('predicate', name)] + list(stats.as_dict().items()))
+                for name, stats in sorted(predicates.items(),
+                                          key=lambda item: item[1].seconds, reverse=True)]
+
+    @staticmethod
+    def _transitions_list(transitions):
+        return [OrderedDict([('source', source), ('trigger', trigger), ('dest', dest)] +
+                            list(stats.as_dict().items()))
+                for (source, trigger, dest), stats in
+                sorted(transitions.items(), key=lambda item: item[1].seconds, reverse=True)]
+
+    @staticmethod
+    def _dispatch_list(dispatch):
+        return [OrderedDict([('parser', parser), ('category', category)] +
+                            list(stats.as_dict().items()))
+                for (parser, category), stats in
+                sorted(dispatch.items(), key=lambda item: item[1].seconds, reverse=True)]
+
+    def as_dict(self):
+        """ Aggregate and per-ME counts, most expensive first """
+        return OrderedDict([
+            ('predicates', RuleCounters._predicates_list(self.predicates)),
+            ('transitions', RuleCounters._transitions_list(self.transitions)),
+            ('dispatch', RuleCounters._dispatch_list(self.dispatch)),
+            ('managed_entities', [
+                OrderedDict([('cid', cid),
+                             ('predicates', RuleCounters._predicates_list(predicates)),
+                             ('transitions', RuleCounters._transitions_list(transitions)),
+                             ('dispatch', RuleCounters._dispatch_list(dispatch))])
+                for cid, (predicates, transitions, dispatch) in self.managed_entities.items()]),
+        ])
+
+    def save(self, filepath):
+        data = json.dumps(self.as_dict(), indent=2, separators=(',', ': '))
+        with open(filepath, 'w') as f:
+            f.write(data)
+
+    def dump(self, limit=10, prefix='  '):
+        print('{}{:<32} {:>8} {:>8} {:>10}'.format(prefix, 'Predicate', 'calls', 'hits', 'ms'))
+        for entry in RuleCounters._predicates_list(self.predicates)[:limit]:
+            print('{}{:<32} {:>8} {:>8} {:>10.3f}'.format(prefix, entry['predicate'],
+                                                          entry['calls'], entry['hits'],
+                                                          entry['seconds'] * 1000))
+        print('')
+        print('{}{:<44} {:>8} {:>8} {:>10}'.format(prefix, 'Transition', 'calls', 'hits', 'ms'))
+        for entry in RuleCounters._transitions_list(self.transitions)[:limit]:
+            name = '{} -{}-> {}'.format(entry['source'], entry['trigger'], entry['dest'])
+            print('{}{:<44} {:>8} {:>8} {:>10.3f}'.format(prefix, name,
+                                                          entry['calls'], entry['hits'],
+                                                          entry['seconds'] * 1000))
+        print('')
+        print('{}{:<44} {:>8} {:>8} {:>10}'.format(prefix, 'Dispatch (parser, category)',
+                                                   'lookups', 'hits', 'ms'))
+        for entry in RuleCounters._dispatch_list(self.dispatch)[:limit]:
+            name = '{} {}'.format(entry['parser'], entry['category'])
+            print('{}{:<44} {:>8} {:>8} {:>10.3f}'.format(prefix, name,
+                                                          entry['calls'], entry['hits'],
+                                                          entry['seconds'] * 1000))
@@ -16,22 +16,105 @@ from __future__ import (
 )
 import re
 import json
+import mmap
+import zlib
+import struct
 from text import ascii_only
 from tables import Table
+from paragraphs import ParagraphList
+from styles import ParagraphStyle
+
+
+def normalized_title(title):
+    """ Section title form used for name lookups """
+    return title.replace(' ', '').lower()
+
+
+def point_order(point):
+    """ Sort key of a section point, numbers in numeric order before other points """
+    return (0, int(point), '') if point.isdigit() else (1, 0, point)
+
+
+class SectionNode(object):
+    """
+    Node in the section number tree. Each level is one point of the section
+    number (9 -> 9.2 -> 9.2.5 ...). A node may have no section of its own
+    if the document skips a level.
+    """
+    def __init__(self):
+        self.positions = list()     # Positions in the section list with this number
+        self.children = dict()      # Key -> (str) section point, Value -> (SectionNode)
+
+    def child(self, point):
+        node = self.children.get(point)
+        if node is None:
+            node = SectionNode()
+            self.children[point] = node
+        return node
+
+    def descendants(self):
+        """
+        Positions of all sections below this node, depth first in section
+        number order (9.2.2 before 9.2.10)
+        """
+        for _point, node in sorted(self.children.items(), key=lambda item: point_order(item[0])):
+            for position in node.positions:
+                yield position
+            for position in node.descendants():
+                yield position
 
 
 class SectionList(object):
-    """ A list of sections (Headings + Paragraphs + Tables) that can be saved/restored"""
+    """
+    A list of sections (Headings + Paragraphs + Tables) that can be saved/restored
+
+    Sections can be looked up by position, section number or title and the
+    subsections of a section number can be listed.  Lookups by number or title
+    use indexes from the section number (or normalized title) to the section
+    position in the section number tree.  The indexes are kept up to date by
+    add() and are rebuilt by load().
+
+    Sections may be saved as JSON or as a binary container (see save_binary).
+    When loaded from a binary container, each section (and the records of its
+    paragraphs) is only read from the file the first time it is accessed.
+    """
+    # Binary container layout:
+    #   header    : magic, (uint32) directory length
+    #   directory : JSON {'version', 'styles': [[name, builtin]],
+    #                     'sections': [[number, title, points, offset, length]]}
+    #   payloads  : for each section, zlib compressed JSON
+    #               {'section': section dict, 'paragraphs': paragraph entries}
+    #               at 'offset' bytes from the end of the directory
+    BINARY_MAGIC = b'G988PCB\x01'
+    BINARY_VERSION = 1
+    _HEADER = struct.Struct(str('<8sI'))
 
     def __init__(self):
         self._sections = list()
+        self.paragraphs = ParagraphList()   # Records of the paragraphs in the sections
+        self.has_paragraphs = True          # False if loaded from a file without records
+        self._by_number = dict()            # Key -> (str) section number, Value -> position
+        self._by_title = dict()             # Key -> (str) normalized title, Value -> position
+        self._tree = SectionNode()          # Root of the section number tree
+        self._mmap = None                   # Binary container, while sections remain unread
+        self._payloads = None               # (start, length) of each section payload
+        self._styles = None                 # (ParagraphStyle) of each container style index
+        self._unread = 0                    # Sections not yet read from the container
 
     def __getitem__(self, item):
-        return self._sections[item]  # delegate to li.__getitem__
+        if isinstance(item, slice):
+            return [self._section(position) for position in range(*item.indices(len(self)))]
+
+        if item < 0:
+            item += len(self._sections)
+        if not 0 <= item < len(self._sections):
+            raise IndexError('list index out of range')
+
+        return self._section(item)
 
     def __iter__(self):
-        for section in self._sections:
-            yield section
+        for position in range(len(self._sections)):
+            yield self._section(position)
 
     def __len__(self):
         return len(self._sections)
@@ -39,65 +122,178 @@ class SectionList(object):
     def add(self, section):
         assert isinstance(section, SectionHeading), 'Invalid type'
         self._sections.append(section)
+        self._index_section(len(self._sections) - 1, section.section_number,
+                            section.title, section.section_points)
         return self
 
+    def _index_section(self, position, section_number, title, section_points):
+        # The first section with a given number or title wins, as with a search
+        if section_number is not None:
+            self._by_number.setdefault(section_number, position)
+
+        if title is not None:
+            self._by_title.setdefault(normalized_title(title), position)
+
+        node = self._tree
+        for point in section_points:
+            node = node.child(point)
+        node.positions.append(position)
+
+    def _rebuild_indexes(self):
+        self._by_number = dict()
+        self._by_title = dict()
+        self._tree = SectionNode()
+
+        for position, section in enumerate(self._sections):
+            self._index_section(position, section.section_number,
+                                section.title, section.section_points)
+
+    def _section(self, position):
+        """ Section at a position, read from the binary container if needed """
+        section = self._sections[position]
+
+        if section is None:
+            start, length = self._payloads[position]
+            payload = json.loads(zlib.decompress(self._mmap[start:start + length]).decode('utf-8'))
+
+            section = SectionHeading.load_dict(payload['section'])
+            self.paragraphs.add_list(payload['paragraphs'], self._styles)
+            self._sections[position] = section
+
+            self._unread -= 1
+            if self._unread == 0:
+                self._close()
+
+        return section
+
+    def _close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+        self._mmap = None
+        self._payloads = None
+        self._styles = None
+        self._unread = 0
+
     def get(self, index):
-        return self._sections[index]
+        return self[index]
+
+    def as_dict(self):
+        return {'sections': self.as_dict_list(),
+                'paragraphs': self.paragraphs.as_dict()}
 
     def save(self, filepath):
-        data = json.dumps(self.as_dict_list(), indent=2, separators=(',', ': '))
+        data = json.dumps(self.as_dict(), indent=2, separators=(',', ': '))
         with open(filepath, 'w') as f:
             f.write(data)
 
+    def save_binary(self, filepath):
+        """
+        Save to a binary container: a directory of the section numbers, titles
+        and payload locations followed by one compressed payload per section
+        holding the section contents and the records of its paragraphs.
+        """
+        styles = list()
+        style_index = dict()
+        entries = list()
+        payloads = list()
+        offset = 0
+
+        for section in self:
+            paragraphs = self.paragraphs.as_list([p for p in section.paragraph_numbers
+                                                  if p in self.paragraphs],
+                                                 styles, style_index)
+            payload = zlib.compress(json.dumps({'section': section.as_dict(),
+                                                'paragraphs': paragraphs},
+                                               separators=(',', ':')).encode('utf-8'))
+            entries.append([section.section_number, section.title, section.section_points,
+                            offset, len(payload)])
+            payloads.append(payload)
+            offset += len(payload)
+
+        directory = json.dumps({'version': SectionList.BINARY_VERSION,
+                                'styles': styles,
+                                'sections': entries},
+                               separators=(',', ':')).encode('utf-8')
+
+        with open(filepath, 'wb') as f:
+            f.write(SectionList._HEADER.pack(SectionList.BINARY_MAGIC, len(directory)))
+            f.write(directory)
+            for payload in payloads:
+                f.write(payload)
+
+    @staticmethod
+    def is_binary(filepath):
+        """ True if the file is a binary container written by save_binary() """
+        with open(filepath, 'rb') as f:
+            return f.read(len(SectionList.BINARY_MAGIC)) == SectionList.BINARY_MAGIC
+
     def load(self, filepath):
+        """ Load from a JSON file or binary container (sections are read on first use) """
+        self._close()
         self._sections = list()
+        self.paragraphs = ParagraphList()
+
+        if SectionList.is_binary(filepath):
+            self._load_binary(filepath)
+        else:
+            self._load_json(filepath)
+
+    def _load_json(self, filepath):
         with open(filepath, 'r') as f:
             data = json.load(f)
-            for head in data:
-                section = SectionHeading()
-                section.style_name = head['style_name']
-                section.section_number = head['section_number']
-                section.title = head['title']
-                section.section_points = head['section_points']
-
-                for content in head['contents']:
-                    if isinstance(content, int):
-                        section.contents.append(content)
-                    elif isinstance(content, dict):
-                        table = Table()
-
-                        table.heading = content.get('heading')
-                        table.doc_table_number = content.get('doc_table_number')
-                        table.table_number = content.get('table_number')
-                        table.num_columns = content.get('num_columns')
-                        table.full_title = content.get('full_title')
-                        table.short_title = content.get('short_title')
-
-                        if isinstance(content.get('rows'), list):
-                            for row in content['rows']:
-                                table.rows.append(row)
-
-                        section.contents.append(table)
-                    else:
-                        print('Unknown type: {}'.format(type(content)))
-
-                self._sections.append(section)
+
+        self.load_dict(data)
+
+    def load_dict(self, data):
+        """ Add the sections (and paragraphs) saved by save() or as_dict() """
+        self.has_paragraphs = isinstance(data, dict)
+        if self.has_paragraphs:
+            self.paragraphs = ParagraphList.load_dict(data['paragraphs'])
+            data = data['sections']
+        # else an older file with only a list of sections
+
+        for head in data:
+            self._sections.append(SectionHeading.load_dict(head))
+
+        self._rebuild_indexes()
+
+    def _load_binary(self, filepath):
+        with open(filepath, 'rb') as f:
+            container = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        _magic, length = SectionList._HEADER.unpack_from(container, 0)
+        start = SectionList._HEADER.size
+        directory = json.loads(container[start:start + length].decode('utf-8'))
+
+        if directory['version'] != SectionList.BINARY_VERSION:
+            container.close()
+            raise ValueError('Unsupported pre-compiled version {} in {}'.
+                             format(directory['version'], filepath))
+
+        base = start + length
+        self._by_number = dict()
+        self._by_title = dict()
+        self._tree = SectionNode()
+        self._payloads = list()
+
+        for position, (number, title, points, offset, size) in enumerate(directory['sections']):
+            self._sections.append(None)
+            self._payloads.append((base + offset, size))
+            self._index_section(position, number, title, points)
+
+        self.has_paragraphs = True
+        self._styles = [ParagraphStyle.create(name, builtin)
+                        for name, builtin in directory['styles']]
+        self._unread = len(self._sections)
+
+        if self._unread:
+            self._mmap = container
+        else:
+            self._close()
+            container.close()
 
     def as_dict_list(self):
-        # Contents is special
-        results = list()
-
-        for item in self._sections:
-            contents = [x if isinstance(x, int) else x.__dict__ for x in item.contents]
-            results.append(
-                {
-                    'contents': contents,
-                    'style_name': item.style_name,
-                    'section_number': item.section_number,
-                    'title': item.title,
-                    'section_points': item.section_points,
-                })
-        return results
+        return [section.as_dict() for section in self]
 
     def dump(self):
         for num, entry in enumerate(self):
@@ -105,17 +301,32 @@ class SectionList(object):
             entry.dump()
 
     def find_section(self, section_number):
-        entry = next((s for s in self if s.section_number == section_number), None)
+        position = self._by_number.get(section_number)
 
-        if entry is not None:
-            return entry
+        if position is not None:
+            return self._section(position)
 
         raise KeyError('Section {} not found'.format(section_number))
 
     def find_section_by_name(self, name):
-        name_lower = name.replace(' ', '').lower()
-        return next((s for s in self
-                    if s.title.replace(' ', '').lower() == name_lower), None)
+        position = self._by_title.get(normalized_title(name))
+        return self._section(position) if position is not None else None
+
+    def subsections(self, section_number):
+        """
+        All sections below a section number (for '9.2': 9.2.1, 9.2.1.1, 9.2.2, ...)
+        in section number order. The section itself is not included.
+
+        :param section_number: (str) Section number
+        :return: (list) SectionHeading objects
+        """
+        node = self._tree
+        for point in section_number.split('.'):
+            node = node.children.get(point)
+            if node is None:
+                return list()
+
+        return [self._section(position) for position in node.descendants()]
 
 
 class SectionHeading(object):
@@ -126,6 +337,9 @@ class SectionHeading(object):
     NOTE: This should not be confused with the docx Section object that is
           provides page setting and format information
     """
+    __slots__ = ('contents', 'style_name', 'section_number', 'title', 'section_points',
+                 'content_hash')
+
     def __init__(self):
         self.contents = list()     # First paragraph holds the heading paragraph
                                    # If (int) then paragraph number, else (Table)
@@ -134,6 +348,7 @@ class SectionHeading(object):
         self.section_number = None
         self.title = None
         self.section_points = []
+        self.content_hash = None   # Hash of heading, paragraph text and table XML
 
     def __str__(self):
         return 'Section: {}: {}, paragraphs: {}'.format(self.section_number,
@@ -151,16 +366,44 @@ class SectionHeading(object):
     def add_contents(self, content):
         self.contents.append(content)
 
+    def as_dict(self):
+        # Contents is special
+        return {
+            'contents': [x if isinstance(x, int) else x.as_dict() for x in self.contents],
+            'style_name': self.style_name,
+            'section_number': self.section_number,
+            'title': self.title,
+            'section_points': self.section_points,
+            'content_hash': self.content_hash,
+        }
+
     @staticmethod
-    def create(number, paragraph):
+    def load_dict(head):
         section = SectionHeading()
+        section.style_name = head['style_name']
+        section.section_number = head['section_number']
+        section.title = head['title']
+        section.section_points = head['section_points']
+        section.content_hash = head.get('content_hash')
+
+        for content in head['contents']:
+            if isinstance(content, int):
+                section.contents.append(content)
+            elif isinstance(content, dict):
+                section.contents.append(Table.load_dict(content))
+            else:
+                print('Unknown type: {}'.format(type(content)))
 
-        section._contents = [number]
+        return section
+
+    @staticmethod
+    def create(number, paragraph, style=None):
+        section = SectionHeading()
 
         if paragraph is  None:
             return section
 
-        section.style_name = paragraph.style.name
+        section.style_name = (style if style is not None else paragraph.style).name
 
         try:
             assert 'heading ' in section.style_name.lower(), 'Heading style not found'
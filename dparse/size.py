@@ -20,6 +20,7 @@ from text import *
 
 class AttributeSize(object):
     """ Object to help describe the size requirements of an attribute """
+    __slots__ = ('_octets', '_bits', '_repeat_count', '_repeat_max')
 
     def __init__(self):
         self._octets = None
@@ -30,6 +31,14 @@ class AttributeSize(object):
     def __str__(self):
         return 'Size: {} bytes'.format(self._octets)
 
+    def as_dict(self):
+        return {
+            'octets': self._octets,
+            'bits': self._bits,
+            'repeat_count': self._repeat_count,
+            'repeat_max': self._repeat_max,
+        }
+
     @staticmethod
     def create_from_keywords(keywords):
         size = None
@@ -0,0 +1,129 @@
+#
+# Copyright (c) 2018 - present.  Boling Consulting Solutions (bcsw.net)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from __future__ import (
+    absolute_import, division, print_function, unicode_literals
+)
+import time
+from collections import deque
+
+
+class MachineError(Exception):
+    """ A trigger is not valid from the current state """
+    pass
+
+
+class StateTable(object):
+    """
+    A lightweight state machine built once per model class and shared by all
+    instances.
+
+    It takes the same 'states' list and 'transitions' dictionaries as the
+    'transitions' library Machine and behaves like a queued Machine with no
+    conditions: for each (state, trigger) the first transition defined wins,
+    a source of '*' covers all states, the model's 'on_enter_<state>' method
+    is called with the trigger arguments on every transition (including to
+    the same state) and triggers fired from within a callback are queued
+    until the current transition is complete.
+
+    The model keeps its current state in 'state' and needs a '_pending'
+    attribute (initially None) for the trigger queue.
+
+    If an observer is set, it is called after each transition as
+    observer(model, source, trigger, dest, seconds) where seconds is the time
+    taken by the 'on_enter_<state>' callback.
+    """
+    def __init__(self, states, transitions, initial):
+        self.states = list(states)
+        self.initial = initial
+        self.triggers = list()
+        self.observer = None
+        self._table = dict()        # Key -> (source, trigger), Value -> (dest, on_enter)
+
+        for transition in transitions:
+            trigger = transition['trigger']
+            source = transition['source']
+            dest = transition['dest']
+
+            if trigger not in self.triggers:
+                self.triggers.append(trigger)
+
+            if source == '*':
+                sources = self.states
+            elif isinstance(source, (list, tuple)):
+                sources = source
+            else:
+                sources = [source]
+
+            for state in sources:
+                self._table.setdefault((state, trigger), (dest, 'on_enter_' + dest))
+
+    def __len__(self):
+        return len(self._table)
+
+    def dest(self, state, trigger):
+        """ Destination state of a trigger, None if not valid from the state """
+        entry = self._table.get((state, trigger))
+        return entry[0] if entry is not None else None
+
+    def add_triggers(self, cls):
+        """ Add a method to the model class for each trigger """
+        def trigger_method(name):
+            def method(model, *args, **kwargs):
+                return self.trigger(model, name, *args, **kwargs)
+            method.__name__ = str(name)
+            method.__doc__ = "Fire the '{}' trigger".format(name)
+            return method
+
+        for name in self.triggers:
+            setattr(cls, name, trigger_method(name))
+        return cls
+
+    def trigger(self, model, trigger, *args, **kwargs):
+        if model._pending is not None:
+            # Called from within a callback
+            model._pending.append((trigger, args, kwargs))
+            return True
+
+        model._pending = deque([(trigger, args, kwargs)])
+        try:
+            while len(model._pending):
+                trigger, args, kwargs = model._pending.popleft()
+                self._fire(model, trigger, args, kwargs)
+        finally:
+            model._pending = None
+
+        return True
+
+    def _fire(self, model, trigger, args, kwargs):
+        entry = self._table.get((model.state, trigger))
+        if entry is None:
+            raise MachineError("Can't trigger event {} from state {}!".format(trigger,
+                                                                                model.state))
+        dest, on_enter = entry
+        source, model.state = model.state, dest
+
+        callback = getattr(model, on_enter, None)
+        observer = self.observer
+
+        if observer is None:
+            if callback is not None:
+                callback(*args, **kwargs)
+            return
+
+        start = time.perf_counter()
+        try:
+            if callback is not None:
+                callback(*args, **kwargs)
+        finally:
+            observer(model, source, trigger, dest, time.perf_counter() - start)
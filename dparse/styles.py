@@ -0,0 +1,197 @@
+#
+# Copyright (c) 2018 - present.  Boling Consulting Solutions (bcsw.net)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+#   Paragraph styles of a document.
+#
+#   A document has a few hundred styles but tens of thousands of paragraphs,
+#   so the style of a paragraph is resolved from its style ID through a table
+#   built once per document, and the style families that the pre-parser,
+#   table extraction and text predicates check are worked out once per style.
+#
+from __future__ import (
+    absolute_import, division, print_function, unicode_literals
+)
+
+# Style families, by how the style name starts
+FAMILY_HEADING = 1 << 0
+FAMILY_NORMAL = 1 << 1
+FAMILY_NOTE = 1 << 2
+FAMILY_DESCRIPTION = 1 << 3
+FAMILY_ATTRIBUTE = 1 << 4
+FAMILY_ATTRIBUTE_LOWER = 1 << 5             # 'attribute'
+FAMILY_ATTRIBUTE_FOLLOWER = 1 << 6
+FAMILY_TOC = 1 << 7
+FAMILY_FIGURE = 1 << 8
+FAMILY_FIGURE_TITLE = 1 << 9
+FAMILY_ENUM = 1 << 10
+
+# Style families, by text anywhere in the lower case style name
+FAMILY_TABLE_HEAD = 1 << 11
+FAMILY_TABLE_TEXT = 1 << 12
+FAMILY_ANY_ATTRIBUTE = 1 << 13
+FAMILY_ANY_ATTRIBUTE_FOLLOWER = 1 << 14
+FAMILY_SECTION_HEADING = 1 << 15            # Built-in 'heading ' style, starts a section
+
+FAMILY_PREFIXES = (
+    ('Heading', FAMILY_HEADING),
+    ('Normal', FAMILY_NORMAL),
+    ('Note', FAMILY_NOTE),
+    ('Description', FAMILY_DESCRIPTION),
+    ('Attribute', FAMILY_ATTRIBUTE),
+    ('attribute', FAMILY_ATTRIBUTE_LOWER),
+    ('Attribute follower', FAMILY_ATTRIBUTE_FOLLOWER),
+    ('toc', FAMILY_TOC),
+    ('Figure', FAMILY_FIGURE),
+    ('Figure_', FAMILY_FIGURE_TITLE),
+    ('enumlev', FAMILY_ENUM),
+)
+
+FAMILY_WORDS = (
+    ('table_head', FAMILY_TABLE_HEAD),
+    ('table_text', FAMILY_TABLE_TEXT),
+    ('attribute', FAMILY_ANY_ATTRIBUTE),
+    ('attribute follower', FAMILY_ANY_ATTRIBUTE_FOLLOWER),
+)
+
+
+def style_family(name, builtin):
+    """ Style family bits of a style name """
+    if name is None:
+        return 0
+
+    family = 0
+    for prefix, bit in FAMILY_PREFIXES:
+        if name.startswith(prefix):
+            family |= bit
+
+    lower = name.lower()
+    for word, bit in FAMILY_WORDS:
+        if word in lower:
+            family |= bit
+
+    if builtin and 'heading ' in lower:
+        family |= FAMILY_SECTION_HEADING
+
+    return family
+
+
+class ParagraphStyle(object):
+    """
+    Name, built-in flag and style families of a paragraph style.
+
+    Only one instance is created for each name/builtin pair so that all
+    records that share a style also share the style object.
+    """
+    _styles = dict()
+
+    def __init__(self, name, builtin):
+        self.name = name
+        self.builtin = builtin
+        self.family = style_family(name, builtin)
+
+    def __str__(self):
+        return 'Style: {}, builtin: {}'.format(self.name, self.builtin)
+
+    @staticmethod
+    def create(name, builtin):
+        key = (name, bool(builtin))
+        style = ParagraphStyle._styles.get(key)
+
+        if style is None:
+            style = ParagraphStyle(name, bool(builtin))
+            ParagraphStyle._styles[key] = style
+
+        return style
+
+
+class StyleTable(object):
+    """
+    Paragraph styles of a document, keyed by style ID.
+
+    As with python-docx, the default paragraph style is used for a paragraph
+    with no style ID, an unknown one or one that is not a paragraph style.
+    """
+    def __init__(self):
+        self._styles = dict()       # Key -> style ID, Value -> (ParagraphStyle) or None
+        self.default = None
+
+    def __len__(self):
+        return len([style for style in self._styles.values() if style is not None])
+
+    def __iter__(self):
+        for style in self._styles.values():
+            if style is not None:
+                yield style
+
+    def add(self, style_id, name, builtin, paragraph=True, default=False):
+        """
+        Add a style, in document order. Only the first style with an ID is used.
+
+        :param style_id: (str) Style ID
+        :param name: (str) UI name of the style
+        :param builtin: (bool) True if a built-in style
+        :param paragraph: (bool) True if a paragraph style
+        :param default: (bool) True if marked as the default style of its type
+        """
+        style = ParagraphStyle.create(name, builtin) if paragraph else None
+
+        if style_id not in self._styles:
+            self._styles[style_id] = style
+
+        if paragraph and default:
+            self.default = style            # Last default in document order wins
+        return self
+
+    def get(self, style_id):
+        """ Look up a paragraph style by ID """
+        if not style_id:
+            return self.default
+        style = self._styles.get(style_id)
+        return style if style is not None else self.default
+
+    def style_of(self, paragraph):
+        """
+        Style of a python-docx or stream paragraph
+
+        :param paragraph: (Paragraph) Docx paragraph, its style is looked up by
+                          ID, or stream paragraph, whose style was looked up as
+                          it was read
+        :return: (ParagraphStyle)
+        """
+        element = getattr(paragraph, '_p', None)
+        if element is None:
+            return paragraph.style
+
+        if not self._styles:
+            # Not created from the document, use the python-docx lookup
+            style = paragraph.style
+            return ParagraphStyle.create(style.name, style.builtin)
+
+        return self.get(element.style)
+
+    @staticmethod
+    def create(styles):
+        """
+        Create from the styles of a python-docx document
+
+        :param styles: (Styles) document.styles
+        :return: (StyleTable)
+        """
+        from docx.enum.style import WD_STYLE_TYPE      # Not needed for stream documents
+
+        table = StyleTable()
+        for style in styles:
+            table.add(style.style_id, style.name, style.builtin,
+                      paragraph=style.type == WD_STYLE_TYPE.PARAGRAPH,
+                      default=style.element.default)
+        return table
@@ -15,13 +15,13 @@ from __future__ import (
     absolute_import, division, print_function, unicode_literals
 )
 import re
-from text import ascii_only
-try:
-    # Python 3
-    from itertools import zip_longest
-except ImportError:
-    # Python 2
-    from itertools import izip_longest as zip_longest
+import sys
+from text import ascii_only, ascii_only_list
+from docxstream import StreamTable
+from styles import StyleTable, FAMILY_TABLE_HEAD, FAMILY_TABLE_TEXT, \
+    FAMILY_ANY_ATTRIBUTE, FAMILY_ANY_ATTRIBUTE_FOLLOWER
+from collections.abc import Mapping, Sequence
+from itertools import zip_longest
 
 
 class TableList(object):
@@ -45,12 +45,12 @@ class TableList(object):
         return self
 
     @staticmethod
-    def create(tables):
+    def create(tables, styles=None):
         tbl_list = TableList(tables=tables)
 
         # Decode is about 2-1/2 minutes
         for idx, tbl in enumerate(tables):
-            table = Table.create(idx, tbl)
+            table = Table.create(idx, tbl, styles)
             tbl_list.add(table)
 
         return tbl_list
@@ -92,6 +92,67 @@ class TableList(object):
     #         } for head in self._tables]
 
 
+class TableRow(Mapping):
+    """
+    Read-only dict-like view of a table row, as {heading: cell text}.
+
+    The heading keys and their positions are shared by all rows of a table,
+    each row only holds a tuple of its cell text.  A row may be shorter than
+    the keys, as it holds the first len(values) of them.
+    """
+    __slots__ = ('_keys', '_index', '_values')
+
+    def __init__(self, keys, index, values):
+        self._keys = keys           # (tuple) Row keys, in order
+        self._index = index         # (dict) Key -> position in keys
+        self._values = values       # (tuple) Cell text
+
+    def __getitem__(self, key):
+        position = self._index.get(key)
+        if position is None or position >= len(self._values):
+            raise KeyError(key)
+        return self._values[position]
+
+    def get(self, key, default=None):
+        position = self._index.get(key)
+        if position is None or position >= len(self._values):
+            return default
+        return self._values[position]
+
+    def __iter__(self):
+        return iter(self._keys[:len(self._values)])
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class TableRows(Sequence):
+    """ Rows of a table, as TableRow views """
+    __slots__ = ('_table',)
+
+    def __init__(self, table):
+        self._table = table
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self._table._row(values) for values in self._table._values[item]]
+        return self._table._row(self._table._values[item])
+
+    def __iter__(self):
+        row = self._table._row
+        for values in self._table._values:
+            yield row(values)
+
+    def __len__(self):
+        return len(self._table._values)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
 class Table(object):
     """
     Minimal table info
@@ -118,15 +179,108 @@ class Table(object):
         Row-Data-1 | Row-Data-2 | ...
         ...
     """
+    __slots__ = ('_heading', '_keys', '_index', '_values', 'doc_table_number', 'num_columns',
+                 'full_title', 'short_title', 'table_number')
+
     def __init__(self):
-        self.rows = []
-        self.heading = None
+        self._heading = None
+        self._keys = ()                     # Unique headings, in order (row keys)
+        self._index = dict()                # Key -> heading, Value -> position in keys
+        self._values = list()               # (tuple) Cell text of each row, or a
+                                            # (TableRow) for rows with other keys
         self.doc_table_number = None        # Index into document table list
         self.num_columns = 0
         self.full_title = None
         self.short_title = None             # From full title string
         self.table_number = None            # From full title string
 
+    @property
+    def heading(self):
+        """ Column headings, interned. Rows may only be added once this is set """
+        return self._heading
+
+    @heading.setter
+    def heading(self, heading):
+        if heading is not None:
+            heading = type(heading)(sys.intern(h) for h in heading)
+            self._keys = tuple(dict.fromkeys(heading))
+            self._index = {key: position for position, key in enumerate(self._keys)}
+
+        self._heading = heading
+
+    @property
+    def rows(self):
+        """ (TableRows) Rows as dict-like {heading: cell text} views """
+        return TableRows(self)
+
+    def _row(self, values):
+        if isinstance(values, TableRow):
+            return values
+        return TableRow(self._keys, self._index, values)
+
+    def add_row(self, text):
+        """
+        Add a row, with the same entries as dict(zip(table.heading, text))
+
+        :param text: (iterable) Cell text of each column
+        """
+        text = tuple(text)
+        heading = self._heading
+
+        if len(self._keys) == len(heading):
+            self._values.append(text[:len(heading)])
+        else:
+            # Repeated headings, the last cell of each is kept
+            self._values.append(tuple(dict(zip(heading, text)).values()))
+        return self
+
+    def add_dict(self, row):
+        """ Add a row from a {heading: cell text} dictionary """
+        keys = tuple(row.keys())
+
+        if self._keys[:len(keys)] == keys:
+            self._values.append(tuple(row.values()))
+        else:
+            self._values.append(TableRow(keys, {key: position for position, key in enumerate(keys)},
+                                         tuple(row.values())))
+        return self
+
+    def as_dict(self):
+        """
+        Compact form for saving. Each row is a list of its cell text in
+        heading order, a row with other keys is saved as a dictionary
+        """
+        return {
+            'heading': self._heading,
+            'doc_table_number': self.doc_table_number,
+            'num_columns': self.num_columns,
+            'full_title': self.full_title,
+            'short_title': self.short_title,
+            'table_number': self.table_number,
+            'rows': [dict(values) if isinstance(values, TableRow) else list(values)
+                     for values in self._values],
+        }
+
+    @staticmethod
+    def load_dict(content):
+        """ Table from as_dict(), or from the rows as dictionaries of older files """
+        table = Table()
+
+        table.heading = content.get('heading')
+        table.doc_table_number = content.get('doc_table_number')
+        table.table_number = content.get('table_number')
+        table.num_columns = content.get('num_columns')
+        table.full_title = content.get('full_title')
+        table.short_title = content.get('short_title')
+
+        if isinstance(content.get('rows'), list):
+            for row in content['rows']:
+                if isinstance(row, dict):
+                    table.add_dict(row)
+                else:
+                    table._values.append(tuple(row))
+        return table
+
     def __str__(self):
         return 'Table {}: columns: {}, rows: {}, {}'.format(self.doc_table_number,
                                                             self.num_columns,
@@ -147,7 +301,7 @@ class Table(object):
         try:
             all_cells = list()
             for _, row in enumerate(rows):
-                text = (ascii_only(cell.text).strip() for cell in row.cells)
+                text = (t.strip() for t in ascii_only_list(cell.text for cell in row.cells))
                 all_cells.extend(text)
 
             # Skip the title cells
@@ -176,8 +330,7 @@ class Table(object):
                 return zip_longest(*args, fillvalue=fillvalue)
 
             for text in grouper(final_cells, table.num_columns):
-                row_data = dict(zip(table.heading, text))
-                table.rows.append(row_data)
+                table.add_row(text)
 
         except Exception as e:
             print('Table parse error in table {} - {}: {}'.format(table.doc_table_number,
@@ -186,15 +339,39 @@ class Table(object):
         return table
 
     @staticmethod
-    def create(index, doc_table):
+    def grid(doc_table, styles=None):
+        """
+        Logical cell grid of a docx or stream table. Stream tables are read
+        as a grid, for docx tables it is built from the table XML
+
+        :param doc_table: (Table) Docx or stream table
+        :param styles: (StyleTable) Styles of the document
+        :return: (StreamTable)
+        """
+        if isinstance(doc_table, StreamTable):
+            return doc_table
+
+        if styles is None or not len(styles):
+            styles = StyleTable.create(doc_table.part.styles)
+
+        return StreamTable.create(doc_table._tbl, styles)
+
+    @staticmethod
+    def create(index, doc_table, styles=None):
+        """
+        :param index: (int) Document table number
+        :param doc_table: (Table) Docx or stream table
+        :param styles: (StyleTable) Styles of the document, see Table.grid()
+        """
         table = Table()
         table.doc_table_number = index
+        grid = Table.grid(doc_table, styles)
 
         try:
-            table.num_columns = len(doc_table.columns)
+            table.num_columns = len(grid.columns)
 
-            for row_num, row in enumerate(doc_table.rows):
-                text = (ascii_only(cell.text) for cell in row.cells)
+            for row_num, row in enumerate(grid.rows):
+                text = ascii_only_list(cell.text for cell in row.cells)
 
                 # Establish the mapping based on the first row
                 # headers; these will become the keys of our dictionary
@@ -214,50 +391,48 @@ class Table(object):
                         table.short_title = ' '.join(tparts[3:] if tparts[2] == '-' else tparts[2:])
                         continue
 
-                    elif all(text_tuple[0].strip().lower() == t.strip().lower()
-                             for t in text_tuple[1:]) and table.full_title is None:
+                    # Cells that match the first one (a merged row)
+                    keys = [t.strip().lower() for t in text_tuple]
+                    merged = [key == keys[0] for key in keys]
+
+                    if all(merged[1:]) and table.full_title is None:
                         # Table with merge row as the title and all are the same
                         table.full_title = next((t.strip() for t in text_tuple
                                                  if len(t.strip())), text_tuple[0])
                         table.short_title = table.full_title
                         continue
 
-                    elif all(text_tuple[0].strip().lower() == t.strip().lower()
-                             for t in text_tuple[1:-1]) and \
-                            len(doc_table.columns) > 3 and table.full_title is None:
+                    elif all(merged[1:-1]) and \
+                            len(grid.columns) > 3 and table.full_title is None:
                         # A special case of the previous example, but the merged
                         # cells have more columns than the table. Probably due to a
                         # column being deleted before publishing and the header was
                         # not corrected.  Must have at least 3 'real' columns.
 
                         table.num_columns = len([y for y in text_tuple if y == text_tuple[0]])
-                        table = Table.table_fixup(table, doc_table.rows, text_tuple[0])
+                        table = Table.table_fixup(table, grid.rows, text_tuple[0])
                         break
 
-                    elif (any('table_head' in c.paragraphs[0].style.name.lower()
-                              for c in row.cells)
-                          or any('attribute follower' in c.paragraphs[0].style.name.lower()
-                                 for c in row.cells)):
-                        # Table with column headings and no title (or title found already)
-                        table.heading = text_tuple
-                        continue
+                    else:
+                        families = row.family
 
-                    elif any('table_text' in c.paragraphs[0].style.name.lower()
-                             for c in row.cells) \
-                            or any('attribute' in c.paragraphs[0].style.name.lower()
-                                   for c in row.cells):
-                        # Table with without heading
-                        table.heading = tuple('col-{}'.format(n)
-                                              for n in range(1, table.num_columns+1))
-                        continue
+                        if families & (FAMILY_TABLE_HEAD | FAMILY_ANY_ATTRIBUTE_FOLLOWER):
+                            # Table with column headings and no title (or title found already)
+                            table.heading = text_tuple
+                            continue
 
-                    else:
-                        # Default type
-                        table.heading = text_tuple
-                        continue
+                        elif families & (FAMILY_TABLE_TEXT | FAMILY_ANY_ATTRIBUTE):
+                            # Table with without heading
+                            table.heading = tuple('col-{}'.format(n)
+                                                  for n in range(1, table.num_columns+1))
+                            continue
+
+                        else:
+                            # Default type
+                            table.heading = text_tuple
+                            continue
 
-                row_data = dict(zip(table.heading, text))
-                table.rows.append(row_data)
+                table.add_row(text)
 
             return table
 
@@ -22,6 +22,8 @@ class ThresholdCrossingAlert(object):
 
     TODO: Can we refactot this to be a subclass of Alarms?
     """
+    __slots__ = ('_table_no', '_alarms')
+
     def __init__(self, table):
         # Table number for debug purposes
         self._table_no = table.doc_table_number
@@ -31,6 +33,13 @@ class ThresholdCrossingAlert(object):
         #   value -> (Name, Threshold value Attribute number)
         self._alarms = dict()
 
+    def as_dict(self):
+        return {
+            'table_number': self._table_no,
+            'alarms': [{'number': number, 'name': name, 'threshold_attribute': threshold}
+                       for number, (name, threshold) in sorted(self._alarms.items())],
+        }
+
     @staticmethod
     def create_from_table(table):
         if len(table.rows) == 0:
@@ -73,5 +82,5 @@ class ThresholdCrossingAlert(object):
             return alarm
 
         except Exception as e:
-            print('TCA table parsing error: {}'.format(e.message))
+            print('TCA table parsing error: {}'.format(e))
             return None
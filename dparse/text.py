@@ -13,6 +13,9 @@
 # limitations under the License.
 
 import types
+from styles import FAMILY_HEADING, FAMILY_NORMAL, FAMILY_NOTE, FAMILY_DESCRIPTION, \
+    FAMILY_ATTRIBUTE, FAMILY_ATTRIBUTE_LOWER, FAMILY_ATTRIBUTE_FOLLOWER, FAMILY_TOC, \
+    FAMILY_FIGURE, FAMILY_FIGURE_TITLE, FAMILY_ENUM
 
 
 def camelcase(inp):
@@ -22,6 +25,60 @@ def camelcase(inp):
     return ''.join(i for i in inp.title() if not i.isspace())
 
 
+# Word characters and their best ASCII equivalents. Any other non-ASCII
+# character becomes a space. See the 'findunicode.py' program for how
+# to search for these
+_REPLACEMENTS = {
+    160  : u'-',
+    174  : u'r',        # Registered sign
+    176  : u"degree-",  # Degree sign
+    177  : u"+/-",
+    181  : u"u",        # Micro
+    189  : u"1/2",
+    215  : u'*',
+    224  : u"`a",
+    946  : u'B',        # Beta
+    956  : u'v',
+    969  : u'w',
+    8211 : u'-',
+    8217 : u"'",
+    8220 : u"``",
+    8221 : u"''",
+    8230 : u"...",
+    8722 : u'-',
+    8804 : u'<=',
+    61664: u'->',
+    8805 : u'>=',
+    8226 : u'o',        # Bullet
+}
+
+
+class _AsciiTable(dict):
+    """
+    str.translate() table for ascii_only(). ASCII characters map to themselves
+    and unknown non-ASCII characters are added as a space the first time seen
+    """
+    def __missing__(self, key):
+        self[key] = u' '
+        return u' '
+
+
+_ASCII_TABLE = _AsciiTable((n, n) for n in range(128))
+_ASCII_TABLE.update(_REPLACEMENTS)
+
+_BATCH_SEPARATOR = u'\x00'       # Can never appear in document text (invalid XML)
+
+
+def _is_ascii(text):
+    """ True if the text is all ASCII (str.isascii() needs Python 3.7) """
+    try:
+        text.encode('ascii')
+        return True
+
+    except UnicodeEncodeError:
+        return False
+
+
 def ascii_only(input_text):
     """
     Map Word Text to best ASCII equivalents
@@ -30,117 +87,135 @@ def ascii_only(input_text):
     :param input_text: (str) input text
     :return: (str) Ascii only text
     """
-    replacements = {
-        160  : u'-',
-        174  : u'r',        # Registered sign
-        176  : u"degree-",  # Degree sign
-        177  : u"+/-",
-        181  : u"u",        # Micro
-        189  : u"1/2",
-        215  : u'*',
-        224  : u"`a",
-        946  : u'B',        # Beta
-        956  : u'v',
-        969  : u'w',
-        8211 : u'-',
-        8217 : u"'",
-        8220 : u"``",
-        8221 : u"''",
-        8230 : u"...",
-        8722 : u'-',
-        8804 : u'<=',
-        61664: u'->',
-        8805 : u'>=',
-        8226 : u'o',        # Bullet
-    }
     if isinstance(input_text, types.GeneratorType):
         text = ''.join(i for i in input_text)
     else:
         text = input_text
 
-    return ''.join(
-            [u'' if len(i) == 0
-             else replacements[ord(i)] if ord(i) >= 128 and ord(i) in replacements
-             else i if ord(i) < 128
-             else u' ' for i in text])
+    if _is_ascii(text):
+        return text
+
+    return text.translate(_ASCII_TABLE)
+
+
+def ascii_only_list(texts):
+    """
+    Map a list of Word Text (such as the cells of a table row) to best ASCII
+    equivalents.  This is the same as calling ascii_only() on each but runs
+    the translation once for the whole list.
+
+    :param texts: (iterable) input text
+    :return: (list) Ascii only text
+    """
+    texts = list(texts)
+    joined = _BATCH_SEPARATOR.join(texts)
+
+    if _is_ascii(joined):
+        return texts
+
+    results = joined.translate(_ASCII_TABLE).split(_BATCH_SEPARATOR)
+
+    if len(results) != len(texts):
+        return [ascii_only(t) for t in texts]
+
+    return results
+
+
+########################################################################
+# Paragraph features
+
+class ParagraphFeatures(object):
+    """
+    Normalized forms of a paragraph's text that the predicates below check.
+    These are computed once per paragraph (see ParagraphRecord.features)
+    rather than by every predicate that is tried against the paragraph.
+    """
+    def __init__(self, text, stripped, prefix):
+        self.text = text                # (str) Ascii only text
+        self.stripped = stripped        # (str) Ascii only text, stripped
+        self.prefix = prefix            # (str) First 12 characters, lower case
+
+    @staticmethod
+    def create(paragraph):
+        text = ascii_only(paragraph.text)
+        return ParagraphFeatures(text, text.strip(), paragraph.text[:12].lower())
 
 
 ########################################################################
 # Headers
 
+IGNORED_HEADINGS = tuple(x[:12].lower() for x in ('Fundamental usage',
+                                                   'todo - abc'))
+EOS_HEADINGS = tuple(x[:12].lower() for x in ('Vendor-specific usage',
+                                               'Supplementary information'))
+EOS_NORMAL_TEXT = tuple(x[:12].lower() for x in ('Supplementary explanation',
+                                                  'Table 9.3.13-1'))
+
+
 def is_heading_style(style):
     """ True if this is a style used as a heading """
-    return 'Heading' in style.name[:len('Heading')]
+    return (style.family & FAMILY_HEADING) != 0
 
 
 def is_ignored_heading(paragraph):
-    text = paragraph.text[:12].lower()
-    return 'Heading' in paragraph.style.name[:len('Heading')] and \
-        any(x[:12].lower() in text for x in ('Fundamental usage',
-                                             'todo - abc'))
+    text = paragraph.features.prefix
+    return is_heading_style(paragraph.style) and \
+        any(x in text for x in IGNORED_HEADINGS)
 
 
 def is_eos_heading(paragraph):          # End of ME section - ignore rest
-    text = paragraph.text[:12].lower()
-    return ('Heading' in paragraph.style.name[:len('Heading')] and
-            any(x[:12].lower() in text for x in ('Vendor-specific usage',
-                                                 'Supplementary information'))) or \
+    text = paragraph.features.prefix
+    return (is_heading_style(paragraph.style) and
+            any(x in text for x in EOS_HEADINGS)) or \
            (is_normal_style(paragraph.style) and
-            any(x[:12].lower() in text for x in ('Supplementary explanation',
-                                                 'Table 9.3.13-1')))
+            any(x in text for x in EOS_NORMAL_TEXT))
 
 
 def is_relationships_header(paragraph):
     """ True if this  paragraph is a heading for the Relationships section """
-    text = ascii_only(paragraph.text).strip()
-    return text == 'Relationships' and \
+    return paragraph.features.stripped == 'Relationships' and \
            (is_heading_style(paragraph.style) or
-            is_style(paragraph.style, 'Normal'))    # See section 9.9.10
+            is_normal_style(paragraph.style))       # See section 9.9.10
 
 
 def is_attributes_header(paragraph):
     """ True if this paragraph is a heading for the Attributes section """
-    text = ascii_only(paragraph.text).strip()
-    return text == 'Attributes' and is_heading_style(paragraph.style)
+    return paragraph.features.stripped == 'Attributes' and is_heading_style(paragraph.style)
 
 
 def is_actions_header(paragraph):
     """ True if this paragraph is a heading for the Actions/Message-Types section """
-    text = ascii_only(paragraph.text).strip()
-    return text == 'Actions' and \
+    return paragraph.features.stripped == 'Actions' and \
            (is_heading_style(paragraph.style) or
             is_normal_style(paragraph.style))
 
 
 def is_notifications_header(paragraph):
     """ True if this paragraph is a heading for the Notifications section """
-    text = ascii_only(paragraph.text).strip()
-    return text == 'Notifications' and \
+    return paragraph.features.stripped == 'Notifications' and \
            (is_heading_style(paragraph.style) or
             is_normal_style(paragraph.style))
 
 
 def is_avcs_header(paragraph):
     """ True if this paragraph is a heading for the AVC section """
-    text = ascii_only(paragraph.text).strip()
     # TODO: If AVCs are always tables, clean this up
-    is_avc = text == 'Attribute Value Change' and is_heading_style(paragraph.style)
+    is_avc = paragraph.features.stripped == 'Attribute Value Change' and \
+        is_heading_style(paragraph.style)
     return is_avc
 
 
 def is_alarms_header(paragraph):
     """ True if this paragraph is a heading for the Alarms section """
-    text = ascii_only(paragraph.text).strip()
     # TODO: If Alarms are always tables, clean this up
-    is_alarm = text == 'Alarm' and is_heading_style(paragraph.style)
+    is_alarm = paragraph.features.stripped == 'Alarm' and is_heading_style(paragraph.style)
     return is_alarm
 
 
 def is_tests_header(paragraph):
     """ True if this paragraph is a heading for the Test Results section """
-    text = ascii_only(paragraph.text).strip()
     # TODO: If Alarms are always paragraphs without headers, clean this up
-    is_test = text == 'Test Result' and is_heading_style(paragraph.style)
+    is_test = paragraph.features.stripped == 'Test Result' and is_heading_style(paragraph.style)
     return is_test
 
 
@@ -148,74 +223,73 @@ def is_tests_header(paragraph):
 # Text section styles
 
 
-def is_style(style, text):
-    return text in style.name[:len(text)]
+#   The style families (see styles.py) are worked out once per style so
+#   these are bit tests rather than style name comparisons
+
+def is_family(style, families):
+    """ True if the style is in any of the style families """
+    return (style.family & families) != 0
 
 
 def is_normal_style(style):
     """ True if this is a style used for normal paragraph text """
-    return is_style(style, 'Normal')
+    return is_family(style, FAMILY_NORMAL)
 
 
 def is_description_style(style):
     """ True if this is a style used for Relationships paragraph text """
-    return is_style(style, 'Normal') or is_style(style, 'Note')
+    return is_family(style, FAMILY_NORMAL | FAMILY_NOTE)
 
 
 def is_relationships_style(style):
     """ True if this is a style used for Relationships paragraph text """
-    return is_style(style, 'Description')
+    return is_family(style, FAMILY_DESCRIPTION)
 
 
 def is_attribute_style(style):
     """ True if this is a style used for Attributes paragraph text """
-    return is_style(style, 'Attribute') or \
-           is_style(style, 'attribute') or \
-           is_style(style, 'Note')
+    return is_family(style, FAMILY_ATTRIBUTE | FAMILY_ATTRIBUTE_LOWER | FAMILY_NOTE)
 
 
 def is_actions_style(style):
     """ True if this is a style used for Actions paragraph text """
-    return is_style(style, 'Attribute') or is_style(style, 'toc')      # See 9.1.14
+    return is_family(style, FAMILY_ATTRIBUTE | FAMILY_TOC)       # See 9.1.14
 
 
 def is_notifications_style(style):
     """ True if this is a style used for Notifications paragraph text """
-    return is_style(style, 'Attribute') or is_normal_style(style) or\
-        is_style(style, 'Description') or\
-        is_style(style, 'toc')                          # See 9.1.14
+    return is_family(style, FAMILY_ATTRIBUTE | FAMILY_NORMAL | FAMILY_DESCRIPTION |
+                     FAMILY_TOC)                        # See 9.1.14
 
 
 def is_avcs_style(style):
     """ True if this is a style used for AVCs paragraph text """
-    return is_style(style, 'Attribute')
+    return is_family(style, FAMILY_ATTRIBUTE)
 
 
 def is_alarms_style(style):
     """ True if this is a style used for Alarms paragraph text """
-    return is_style(style, 'Attribute') or is_style(style, 'Note') or \
-           is_style(style, 'Normal') or is_figure_style(style) or \
-           is_figure_title_style(style)
+    return is_family(style, FAMILY_ATTRIBUTE | FAMILY_NOTE | FAMILY_NORMAL | FAMILY_FIGURE)
 
 
 def is_tests_style(style):
     """ True if this is a style used for Test Results paragraph text """
-    return is_style(style, 'Attribute')
+    return is_family(style, FAMILY_ATTRIBUTE)
 
 
 def is_figure_style(style):
     """ True if this is a style used for a figure"""
-    return is_style(style, 'Figure') and not is_figure_title_style(style)
+    return is_family(style, FAMILY_FIGURE) and not is_figure_title_style(style)
 
 
 def is_figure_title_style(style):
     """ True if this is a style used for text under a figure"""
-    return is_style(style, 'Figure_')
+    return is_family(style, FAMILY_FIGURE_TITLE)
 
 
 def is_enum_style(style):
     """ True if this is a style used for enumeration (bullet lists, ...)"""
-    return is_style(style, 'enumlev')
+    return is_family(style, FAMILY_ENUM)
 
 
 ########################################################################
@@ -224,10 +298,10 @@ def is_enum_style(style):
 def is_description_text(paragraph):
     """ True if this is a style used for Attributes paragraph text """
     return is_description_style(paragraph.style) or \
-        is_style(paragraph.style, 'Attribute follower') or \
+        is_family(paragraph.style, FAMILY_ATTRIBUTE_FOLLOWER) or \
            (is_heading_style(paragraph.style) and
-            ('Multicast interworking GEM ' in ascii_only(paragraph.text) or
-             'Discovery of multicast ' in ascii_only(paragraph.text)))   # See 9.2.5
+            ('Multicast interworking GEM ' in paragraph.features.text or
+             'Discovery of multicast ' in paragraph.features.text))   # See 9.2.5
 
 
 def is_relationships_text(paragraph):
@@ -236,15 +310,15 @@ def is_relationships_text(paragraph):
         (is_relationships_style(paragraph.style) or
          is_attribute_style(paragraph.style) or
          is_normal_style(paragraph.style) or
-         is_style(paragraph.style, 'Description'))  # see 9.9.10
+         is_relationships_style(paragraph.style))   # see 9.9.10
 
 
 def is_attribute_text(paragraph):
     """ True if this is a style used for Attributes paragraph text """
     return not (is_attributes_header(paragraph) and
                 is_attribute_style(paragraph.style)) or \
-               (is_heading_style(paragraph.style) and            # For bad formatting in
-                'Value\tINPmin' in ascii_only(paragraph.text))   # section 9.7.7
+               (is_heading_style(paragraph.style) and              # For bad formatting in
+                'Value\tINPmin' in paragraph.features.text)       # section 9.7.7
 
 
 def is_actions_text(paragraph):
@@ -0,0 +1,172 @@
+#
+# Copyright (c) 2018 - present.  Boling Consulting Solutions (bcsw.net)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from __future__ import (
+    absolute_import, division, print_function, unicode_literals
+)
+import sys
+import json
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class StageTime(object):
+    """ Accumulated wall and CPU time of a stage """
+    def __init__(self):
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+
+    def add(self, wall, cpu, calls=1):
+        self.calls += calls
+        self.wall += wall
+        self.cpu += cpu
+
+    def as_dict(self):
+        return {
+            'calls': self.calls,
+            'wall': self.wall,
+            'cpu': self.cpu,
+        }
+
+
+class Timing(object):
+    """
+    Wall and CPU time of each stage of a run, per-ME deep parse times and
+    item counts, saved as a JSON report.
+
+    Stages are timed with 'with timing.stage(name):'. A stage entered more
+    than once (Table.create, for instance) accumulates its time and number
+    of calls. Stages may be nested, so the time of an inner stage is also
+    included in the outer one.  When disabled, nothing is recorded.
+
+    If a profiler is given, it is told as each stage is entered and exited
+    whether or not timing is enabled.
+    """
+    def __init__(self, program, enabled=True, profiler=None):
+        self.program = program
+        self.enabled = enabled
+        self.profiler = profiler                # (Profiler) Optional
+        self.stages = OrderedDict()             # Key -> (str) stage, Value -> (StageTime)
+        self.counts = OrderedDict()             # Key -> (str) item, Value -> (int) count
+        self.managed_entities = list()          # (dict) for each ME deep parsed
+        self._started = time.time()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+
+    @staticmethod
+    def now():
+        """ (wall, cpu) time stamp for elapsed() """
+        return time.perf_counter(), time.process_time()
+
+    @staticmethod
+    def elapsed(start):
+        """ (wall, cpu) seconds since a now() time stamp """
+        return time.perf_counter() - start[0], time.process_time() - start[1]
+
+    @contextmanager
+    def stage(self, name):
+        with self.profile_scope(name):
+            if not self.enabled:
+                yield
+                return
+
+            start = Timing.now()
+            try:
+                yield
+            finally:
+                self.add(name, *Timing.elapsed(start))
+
+    @contextmanager
+    def profile_scope(self, *scopes):
+        """ Mark stage names or ME class IDs for the profiler, if any """
+        profiler = self.profiler
+        if profiler is None:
+            yield
+            return
+
+        for scope in scopes:
+            profiler.enter(scope)
+        try:
+            yield
+        finally:
+            for scope in reversed(scopes):
+                profiler.exit(scope)
+
+    def add(self, name, wall, cpu, calls=1):
+        if self.enabled:
+            stage = self.stages.get(name)
+            if stage is None:
+                stage = StageTime()
+                self.stages[name] = stage
+            stage.add(wall, cpu, calls=calls)
+
+    def merge(self, stages):
+        """
+        Add the stage times of another run, a worker process for instance
+
+        :param stages: (dict) Key -> (str) stage, Value -> (dict) StageTime.as_dict()
+        """
+        for name, stage in stages.items():
+            self.add(name, stage['wall'], stage['cpu'], calls=stage['calls'])
+
+    def count(self, name, value):
+        if self.enabled:
+            self.counts[name] = value
+
+    def add_managed_entity(self, class_id, wall, cpu):
+        """ Record the deep parse time and item counts of an ME """
+        if not self.enabled:
+            return
+
+        section = class_id.section
+        self.managed_entities.append(OrderedDict([
+            ('cid', class_id.cid),
+            ('name', class_id.name),
+            ('section', section.section_number if section is not None else None),
+            ('state', class_id.state),
+            ('wall', wall),
+            ('cpu', cpu),
+            ('paragraphs', len(section.paragraph_numbers) if section is not None else 0),
+            ('tables', len(section.tables) if section is not None else 0),
+            ('attributes', len(class_id.attributes)),
+            ('actions', len(class_id.actions)),
+            ('alarms', class_id.alarms is not None),
+            ('avcs', class_id.avcs is not None),
+        ]))
+        self.add('deep_parse', wall, cpu)
+
+    def as_dict(self):
+        wall, cpu = Timing.elapsed((self._wall, self._cpu))
+
+        return OrderedDict([
+            ('program', self.program),
+            ('argv', sys.argv[1:]),
+            ('started', self._started),
+            ('wall', wall),
+            ('cpu', cpu),
+            ('stages', OrderedDict((name, stage.as_dict())
+                                   for name, stage in self.stages.items())),
+            ('counts', self.counts),
+            ('managed_entities', sorted(self.managed_entities,
+                                        key=lambda me: me['wall'], reverse=True)),
+        ])
+
+    def save(self, filepath):
+        if not self.enabled:
+            return
+
+        data = json.dumps(self.as_dict(), indent=2, separators=(',', ': '))
+        with open(filepath, 'w') as f:
+            f.write(data)
@@ -0,0 +1,255 @@
+#
+# Copyright (c) 2018 - present.  Boling Consulting Solutions (bcsw.net)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+#   Streaming output of the parsed MEs.
+#
+#   Each ME is serialized and written as soon as its deep parse completes, so
+#   the output document is never built in memory.  Two formats are supported:
+#
+#     json   - A single JSON document:
+#                {"version": 1, "managed_entities": [{ME}, {ME}, ...]}
+#
+#     ndjson - One ME per line (newline-delimited JSON) that a consumer can
+#              read one record at a time
+#
+#   ShardedMEWriter instead writes one file per ME and an index of the class ID,
+#   name, section, file and content hash of each, so a consumer can load just
+#   the MEs it needs and skip those whose hash has not changed since its last run.
+#
+from __future__ import (
+    absolute_import, division, print_function, unicode_literals
+)
+import io
+import os
+import json
+import hashlib
+from collections import OrderedDict
+
+FORMATS = ('json', 'ndjson')
+INDEX_FILE = 'index.json'
+
+
+class MEWriter(object):
+    """ Writes ClassId objects to a JSON or NDJSON file, one at a time """
+    VERSION = 1
+
+    def __init__(self, filepath, output_format='json'):
+        if output_format not in FORMATS:
+            raise ValueError('Unknown output format: {}'.format(output_format))
+
+        self.filepath = filepath
+        self.output_format = output_format
+        self.count = 0
+        self._file = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def open(self):
+        self._file = io.open(self.filepath, 'w', encoding='utf-8')
+        self.count = 0
+
+        if self.output_format == 'json':
+            self._file.write('{{\n  "version": {},\n  "managed_entities": ['.format(MEWriter.VERSION))
+        return self
+
+    def write(self, class_id):
+        """
+        Serialize and write a parsed ME
+
+        :param class_id: (ClassId) ME, after its deep parse
+        """
+        self.write_record(class_id.as_dict())
+
+    def write_record(self, record):
+        """ Write an ME already serialized with ClassId.as_dict() """
+        assert self._file is not None, 'Writer is not open'
+
+        if self.output_format == 'ndjson':
+            self._file.write(json.dumps(record, sort_keys=True, separators=(',', ':')))
+            self._file.write('\n')
+        else:
+            data = json.dumps(record, indent=2, sort_keys=True, separators=(',', ': '))
+            self._file.write(',\n    ' if self.count else '\n    ')
+            self._file.write(data.replace('\n', '\n    '))
+
+        self.count += 1
+        self._file.flush()
+
+    def close(self):
+        if self._file is None:
+            return
+
+        try:
+            if self.output_format == 'json':
+                self._file.write('\n  ]\n}\n' if self.count else ']\n}\n')
+        finally:
+            self._file.close()
+            self._file = None
+
+
+class ShardedMEWriter(object):
+    """
+    Writes each ClassId to its own file in a directory, plus an index file
+    written when closed.
+
+    A shard whose content hash matches the previous index is not rewritten.
+    Shards of MEs no longer in the output are removed, unless the run did not
+    complete, in which case the MEs not written keep their previous entries.
+    """
+    VERSION = 1
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.count = 0
+        self.unchanged = 0
+        self._index = None
+        self._previous = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close(complete=exc_type is None)
+
+    def open(self):
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+        try:
+            self._previous = read_index(self.directory)
+        except (IOError, OSError, ValueError, KeyError):
+            self._previous = dict()
+
+        self._index = dict()
+        self.count = 0
+        self.unchanged = 0
+        return self
+
+    @staticmethod
+    def shard_name(cid):
+        return 'me-{:05d}.json'.format(cid)
+
+    def write(self, class_id):
+        """
+        Serialize and write a parsed ME to its shard
+
+        :param class_id: (ClassId) ME, after its deep parse
+        """
+        self.write_record(class_id.as_dict())
+
+    def write_record(self, record):
+        """ Write an ME already serialized with ClassId.as_dict() """
+        assert self._index is not None, 'Writer is not open'
+
+        cid = record['class_id']
+        data = json.dumps(record, indent=2, sort_keys=True, separators=(',', ': ')).encode('utf-8')
+        content_hash = hashlib.sha256(data).hexdigest()
+        name = ShardedMEWriter.shard_name(cid)
+        filepath = os.path.join(self.directory, name)
+
+        previous = self._previous.get(cid)
+        if previous is not None and previous['hash'] == content_hash and \
+                previous['file'] == name and os.path.isfile(filepath):
+            self.unchanged += 1
+        else:
+            with open(filepath, 'wb') as f:
+                f.write(data)
+
+        self._index[cid] = OrderedDict([
+            ('file', name),
+            ('hash', content_hash),
+            ('name', record['name']),
+            ('section', record['section']),
+        ])
+        self.count += 1
+
+    def close(self, complete=True):
+        if self._index is None:
+            return
+
+        for cid, entry in self._previous.items():
+            if cid in self._index:
+                continue
+            if not complete:
+                self._index[cid] = entry
+                continue
+            try:
+                os.remove(os.path.join(self.directory, entry['file']))
+            except OSError:
+                pass
+
+        # Not sort_keys, which would order the class IDs as strings ('11' before '2')
+        index = OrderedDict([
+            ('managed_entities', OrderedDict((str(cid), self._index[cid])
+                                             for cid in sorted(self._index))),
+            ('version', ShardedMEWriter.VERSION),
+        ])
+        with open(os.path.join(self.directory, INDEX_FILE), 'w') as f:
+            f.write(json.dumps(index, indent=2, separators=(',', ': ')))
+
+        self._index = None
+
+
+def read_index(directory):
+    """
+    Read the index of a ShardedMEWriter directory
+
+    :param directory: (str) Shard directory
+    :return: (dict) Key -> (int) class ID, Value -> (dict) name, section, file and hash
+    """
+    with open(os.path.join(directory, INDEX_FILE), 'r') as f:
+        index = json.load(f)
+
+    return {int(cid): entry for cid, entry in index['managed_entities'].items()}
+
+
+def read_shard(directory, entry):
+    """
+    Read one ME from a ShardedMEWriter directory
+
+    :param directory: (str) Shard directory
+    :param entry: (dict) Index entry of the ME, see read_index()
+    :return: (dict) The ME as saved by ClassId.as_dict()
+    """
+    with io.open(os.path.join(directory, entry['file']), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def read_managed_entities(filepath):
+    """
+    Read the MEs written by MEWriter, in either format
+
+    :param filepath: (str) Output of the parser
+    :return: (generator) One dictionary per ME, NDJSON files are read a line at a time
+    """
+    with io.open(filepath, 'r', encoding='utf-8') as f:
+        first = f.readline()
+        try:
+            record = json.loads(first)
+        except ValueError:
+            record = None
+
+        if isinstance(record, dict) and 'class_id' in record:
+            yield record
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+
+        f.seek(0)
+        for record in json.load(f).get('managed_entities', []):
+            yield record